@@ -0,0 +1,67 @@
+"""Benchmark waktu load data training: CSV lama (list JSON per sel) vs Parquet
+dengan kolom list native.
+
+Jalankan dari root repo:
+    python -m benchmarks.catalog_load --scale 50
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.models.cbf.model import load_training_data
+from benchmarks.sparse_features import load_catalog
+
+
+def write_csv(df, path):
+    """Format CSV lama dari convertion(): list sebagai string JSON, QUOTE_ALL"""
+    df = df.copy()
+    df['ingredients'] = df['ingredients'].apply(lambda x: json.dumps(x, ensure_ascii=False))
+    df['tags'] = df['tags'].apply(lambda x: json.dumps(x, ensure_ascii=False))
+    df.to_csv(path, index=False, quoting=csv.QUOTE_ALL, escapechar='\\', encoding='utf-8')
+
+
+def best_of(path, repeats):
+    """Waktu load tercepat (detik) dari beberapa percobaan"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = load_training_data(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV vs Parquet load benchmark')
+    parser.add_argument('--scale', type=int, default=20, help='Faktor replikasi katalog')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    df = load_catalog(args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'catalog.csv')
+        parquet_path = os.path.join(tmp, 'catalog.parquet')
+        write_csv(df, csv_path)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), parquet_path)
+
+        csv_time, from_csv = best_of(csv_path, args.repeats)
+        parquet_time, from_parquet = best_of(parquet_path, args.repeats)
+        same = all(
+            list(a) == list(b)
+            for column in ('ingredients', 'tags')
+            for a, b in zip(from_csv[column], from_parquet[column])
+        )
+
+        print(f"Katalog: {len(df)} meals | isi list identik: {same}")
+        print(f"{'format':<8} {'ukuran':>10} {'load':>10}")
+        for name, path, seconds in (('csv', csv_path, csv_time), ('parquet', parquet_path, parquet_time)):
+            print(f"{name:<8} {os.path.getsize(path) / 2**20:>8.1f}MB {seconds * 1000:>8.1f}ms")
+        print(f"Parquet {csv_time / parquet_time:.1f}x lebih cepat")
+
+
+if __name__ == "__main__":
+    main()
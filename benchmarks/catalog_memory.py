@@ -0,0 +1,113 @@
+"""Benchmark memori katalog in-memory: DataFrame vs MealCatalog, dan dtype
+baris fitur (float64 / float32 / int8) terhadap kualitas ranking.
+
+Per varian dilaporkan ukuran metadata & matriks ternormalisasi, alokasi
+per query (tracemalloc), RSS worker baru (Linux) setelah load + query, serta
+overlap@k dan kecocokan urutan terhadap baseline float64 + DataFrame.
+
+Jalankan dari root repo:
+    python -m benchmarks.catalog_memory --rows 100000
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import tempfile
+import tracemalloc
+import numpy as np
+
+from src.models.cbf.model import CBFTrainer
+from src.models.cbf.recommender import CBFRecommender
+from benchmarks.synthetic import generate_catalog
+
+VARIANTS = [
+    ('float64 + DataFrame', 'float64', False),
+    ('float32 + MealCatalog', 'float32', True),
+    ('int8 + MealCatalog', 'int8', True),
+]
+MEAL_TYPES = [None, 'Sarapan', 'Makan Siang', 'Makan Malam']
+
+
+def make_queries(ids, count, seed):
+    rng = np.random.default_rng(seed)
+    return [(rng.choice(ids, size=3, replace=False).tolist(), MEAL_TYPES[i % len(MEAL_TYPES)])
+            for i in range(count)]
+
+
+def rankings(recommender, queries, k):
+    return [recommender.recommend(history, n=k, meal_type=meal_type)['id'].tolist()
+            for history, meal_type in queries]
+
+
+def current_rss():
+    """RSS proses saat ini (MB) dari /proc, bukan puncak seperti ru_maxrss"""
+    with open('/proc/self/status', encoding='ascii') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def worker_rss(model_dir, compact, queries, k, result):
+    """Dijalankan di proses baru: RSS (MB) setelah load + seluruh query"""
+    recommender = CBFRecommender(model_dir, cache_size=0, compact=compact)
+    rankings(recommender, queries, k)
+    gc.collect()
+    result.put(current_rss())
+
+
+def measure(model_dir, compact, queries, k):
+    recommender = CBFRecommender(model_dir, cache_size=0, compact=compact)
+    if compact:
+        metadata = recommender.catalog.nbytes
+    else:
+        metadata = int(recommender.meal_data.memory_usage(deep=True).sum())
+    matrix = recommender.normalized_matrix
+    matrix_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    tracemalloc.start()
+    for history, meal_type in queries[:50]:
+        recommender.recommend(history, n=k, meal_type=meal_type)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    context = multiprocessing.get_context('spawn')
+    result = context.Queue()
+    process = context.Process(target=worker_rss, args=(model_dir, compact, queries, k, result))
+    process.start()
+    rss = result.get()
+    process.join()
+    return recommender, {'metadata': metadata, 'matrix': matrix_bytes, 'query_peak': peak, 'rss': rss}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact catalog memory benchmark')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.rows, args.seed)
+    queries = make_queries(catalog['id'].to_numpy(), args.queries, args.seed)
+
+    print(f"Katalog: {args.rows} meals, {args.queries} query, k={args.k}")
+    print(f"{'varian':<24} {'metadata':>10} {'matriks':>10} {'peak/query':>11} {'RSS worker':>11} "
+          f"{'overlap@k':>10} {'urutan sama':>12}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, dtype, compact in VARIANTS:
+            model_dir = os.path.join(tmp, dtype)
+            CBFTrainer(model_dir=model_dir, feature_dtype=dtype).train(df=catalog.copy())
+            recommender, sizes = measure(model_dir, compact, queries, args.k)
+            ranked = rankings(recommender, queries, args.k)
+            if baseline is None:
+                baseline = ranked
+            overlap = np.mean([len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(baseline, ranked)])
+            same = np.mean([a == b for a, b in zip(baseline, ranked)])
+            print(f"{name:<24} {sizes['metadata'] / 2**20:>8.1f}MB {sizes['matrix'] / 2**20:>8.1f}MB "
+                  f"{sizes['query_peak'] / 2**10:>9.1f}KB {sizes['rss']:>9.1f}MB {overlap:>10.3f} {same:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
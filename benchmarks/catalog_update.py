@@ -0,0 +1,74 @@
+"""Benchmark update katalog inkremental vs full retrain.
+
+Per ukuran katalog dilaporkan waktu CatalogUpdater.update untuk satu meal
+baru (append) dan satu meal yang diganti, dibanding CBFTrainer.train penuh,
+beserta ruang disk folder bundles/ setelah beberapa update (keep_bundles).
+
+Jalankan dari root repo:
+    python -m benchmarks.catalog_update --rows 100000 --ann
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from src.models.cbf.incremental import CatalogUpdater
+from src.models.cbf.model import CBFTrainer
+from benchmarks.synthetic import generate_catalog
+
+
+def disk_usage(path):
+    """Byte file unik (hard link dihitung sekali) di bawah path"""
+    seen, total = set(), 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental catalog update benchmark')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--updates', type=int, default=5)
+    parser.add_argument('--ann', action='store_true', help='Bundle dengan index IVF')
+    parser.add_argument('--feature-dtype', default='int8')
+    parser.add_argument('--keep-bundles', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.rows + args.updates, args.seed)
+    base = catalog.iloc[:args.rows]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trainer = CBFTrainer(model_dir=tmp, build_ann=args.ann, feature_dtype=args.feature_dtype)
+        start = time.perf_counter()
+        trainer.train(df=base.copy())
+        train_time = time.perf_counter() - start
+
+        updater = CatalogUpdater(tmp, drift_threshold=float('inf'), keep_bundles=args.keep_bundles)
+        appends = []
+        for i in range(args.updates):
+            start = time.perf_counter()
+            updater.update(catalog.iloc[args.rows + i:args.rows + i + 1].copy())
+            appends.append(time.perf_counter() - start)
+
+        changed = base.iloc[[len(base) // 2]].copy()
+        changed['calories'] += 25
+        start = time.perf_counter()
+        updater.update(changed)
+        replace_time = time.perf_counter() - start
+
+        bundles_dir = os.path.join(tmp, 'bundles')
+        versions = [name for name in os.listdir(bundles_dir) if os.path.isdir(os.path.join(bundles_dir, name))]
+        print(f"Katalog: {args.rows} meals, dtype {args.feature_dtype}, ANN {'ya' if args.ann else 'tidak'}")
+        print(f"{'full train':<24} {train_time * 1000:>9.1f}ms")
+        print(f"{'update 1 meal baru':<24} {min(appends) * 1000:>9.1f}ms (min dari {len(appends)})")
+        print(f"{'update 1 meal diganti':<24} {replace_time * 1000:>9.1f}ms")
+        print(f"bundles/: {len(versions)} versi, {disk_usage(bundles_dir) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
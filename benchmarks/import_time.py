@@ -0,0 +1,78 @@
+"""Budget waktu import / start CLI.
+
+Setiap target dijalankan di interpreter baru beberapa kali; waktu terbaik
+dikurangi start interpreter kosong lalu dibandingkan dengan budget. Modul
+yang dilarang (mis. pandas untuk `main.py --help`) tidak boleh ikut terimpor.
+Exit code 1 bila ada target yang melewati budget, sehingga bisa dipakai di CI.
+
+Jalankan dari root repo:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --scale 2   # budget dikali 2 untuk mesin lambat
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+HEAVY = ('pandas', 'sklearn', 'joblib', 'scipy', 'pyarrow', 'ydata_profiling')
+
+# (nama, argumen python, budget ms di atas interpreter kosong, modul terlarang)
+TARGETS = [
+    ('main --help', ['main.py', '--help'], 150, HEAVY + ('numpy',)),
+    ('import src.models', ['-c', 'import src.models'], 50, HEAVY + ('numpy',)),
+    ('import lite', ['-c', 'import src.models.cbf.lite'], 250, HEAVY),
+    ('import recommender', ['-c', 'import src.models.cbf.recommender'], 900, ('sklearn', 'joblib', 'ydata_profiling')),
+    ('import metrics', ['-c', 'import src.utils.metrics'], 50, HEAVY + ('numpy',)),
+]
+
+
+def best_time(args, repeats):
+    """Waktu tercepat (detik) menjalankan python dengan args"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def loaded_modules(args):
+    """Modul yang terimpor setelah target dijalankan (--help keluar via SystemExit)"""
+    if args[0] == '-c':
+        code = f"import sys; {args[1]}; print(','.join(sorted(sys.modules)))"
+    else:
+        code = (
+            f"import sys, runpy; sys.argv = {args!r}\n"
+            f"try:\n    runpy.run_path({args[0]!r}, run_name='__main__')\n"
+            f"except SystemExit:\n    pass\n"
+            f"print(','.join(sorted(sys.modules)))"
+        )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return {name.split('.')[0] for name in out.strip().splitlines()[-1].split(',')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Budget waktu import')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help='Pengali budget')
+    args = parser.parse_args()
+
+    baseline = best_time(['-c', 'pass'], args.repeats)
+    print(f"Interpreter kosong: {baseline * 1000:.1f}ms")
+    print(f"{'target':<20} {'waktu':>9} {'budget':>9}  status")
+    failed = False
+    for name, target_args, budget_ms, forbidden in TARGETS:
+        elapsed = (best_time(target_args, args.repeats) - baseline) * 1000
+        budget = budget_ms * args.scale
+        leaked = sorted(loaded_modules(target_args) & set(forbidden))
+        ok = elapsed <= budget and not leaked
+        failed |= not ok
+        status = 'OK' if ok else 'GAGAL'
+        if leaked:
+            status += f" (terimpor: {', '.join(leaked)})"
+        print(f"{name:<20} {elapsed:>7.1f}ms {budget:>7.0f}ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Load test server rekomendasi (python main.py --serve).
+
+Jalankan dari root repo saat server sudah berjalan:
+    python -m benchmarks.load_test --concurrency 64 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import numpy as np
+
+MEAL_TYPES = [None, 'Sarapan', 'Makan Siang', 'Makan Malam']
+
+
+async def request(reader, writer, payload):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(
+        b"POST /recommend HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status.split(b' ', 2)[1] == b'200'
+
+
+async def client(args, counter, latencies, errors, rng):
+    if args.unix_socket:
+        reader, writer = await asyncio.open_unix_connection(args.unix_socket)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while counter[0] < args.requests:
+            counter[0] += 1
+            payload = {
+                'meal_ids': rng.sample(range(1, args.max_id + 1), args.history),
+                'n': args.n,
+                'meal_type': rng.choice(MEAL_TYPES),
+            }
+            start = time.perf_counter()
+            ok = await request(reader, writer, payload)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors[0] += 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    counter, errors, latencies = [0], [0], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(args, counter, latencies, errors, random.Random(args.seed + i))
+        for i in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    print(f"{len(latencies)} request, {args.concurrency} koneksi, {errors[0]} error")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latency   : p50={p50:.2f} ms | p95={p95:.2f} ms | p99={p99:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test untuk main.py --serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix-socket', default=None)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--history', type=int, default=3)
+    parser.add_argument('--n', type=int, default=5)
+    parser.add_argument('--max-id', type=int, default=1346)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark recommend dengan batasan rentang nutrisi.
+
+Per batas kalori dilaporkan porsi pool yang lolos index rentang serta latency
+recommend terbatas vs tanpa batasan (cache nonaktif, riwayat acak per query).
+Semua batasan diukur bergiliran per query (urutan digeser tiap query, karena
+panggilan setelah batasan lain ikut menanggung cache yang tergusur) dan
+diambil putaran tercepat, sehingga gangguan mesin mengenai semua baris merata.
+
+Jalankan dari root repo:
+    python -m benchmarks.range_filter --rows 100000
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+
+from src.models.cbf.model import CBFTrainer
+from src.models.cbf.recommender import CBFRecommender
+from benchmarks.synthetic import generate_catalog
+
+MEAL_TYPE = 'Makan Siang'
+
+
+def latencies(recommender, histories, k, settings):
+    """Rata-rata detik per recommend untuk tiap ranges, diukur bergiliran per query"""
+    totals = [0.0] * len(settings)
+    for q, history in enumerate(histories):
+        for shift in range(len(settings)):
+            i = (q + shift) % len(settings)
+            start = time.perf_counter()
+            recommender.recommend(history, n=k, meal_type=MEAL_TYPE, ranges=settings[i])
+            totals[i] += time.perf_counter() - start
+    return [total / len(histories) for total in totals]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Range-constrained recommend benchmark')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=5, help='Jumlah putaran')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.rows, args.seed)
+    rng = np.random.default_rng(args.seed)
+    histories = [rng.choice(catalog['id'].to_numpy(), size=3, replace=False).tolist()
+                 for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        CBFTrainer(model_dir=tmp).train(df=catalog.copy())
+        recommender = CBFRecommender(tmp, cache_size=0)
+        index = recommender.range_index(MEAL_TYPE)
+        calories = np.sort(index.values[:, 0])
+
+        limits = [float(calories[int(fraction * (len(calories) - 1))]) for fraction in (0.01, 0.05, 0.2, 0.5, 0.9)]
+        settings = [None] + [{'calories': (None, limit)} for limit in limits]
+        best = [float('inf')] * len(settings)
+        for _ in range(args.repeats):
+            best = [min(pair) for pair in zip(best, latencies(recommender, histories, args.k, settings))]
+
+        baseline = best[0]
+        print(f"Katalog: {args.rows} meals, pool {MEAL_TYPE}: {len(index)} baris, k={args.k}")
+        print(f"{'batasan':<28} {'lolos':>8} {'latency':>10} {'vs tanpa':>9}")
+        print(f"{'tanpa batasan':<28} {1:>8.1%} {baseline * 1000:>8.2f}ms {1:>8.2f}x")
+        for limit, ranges, elapsed in zip(limits, settings[1:], best[1:]):
+            passed = len(index.select(ranges)) / len(index)
+            label = f"calories <= {limit:.0f}"
+            print(f"{label:<28} {passed:>8.1%} {elapsed * 1000:>8.2f}ms {elapsed / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
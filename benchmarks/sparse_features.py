@@ -0,0 +1,73 @@
+"""Benchmark memori & latency query: feature matrix dense vs sparse (CSR).
+
+Jalankan dari root repo:
+    python -m benchmarks.sparse_features --scale 20
+"""
+import argparse
+import ast
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.models.cbf.feature_engineering import FeatureEngineer
+
+DATA_PATH = 'models/meal_data.csv'
+
+
+def load_catalog(scale: int, seed: int = 42) -> pd.DataFrame:
+    """Perbesar katalog dengan replikasi + tag varian agar vocabulary ikut tumbuh"""
+    base = pd.read_csv(DATA_PATH, usecols=['id', 'name', 'type', 'calories',
+                                           'protein', 'fat', 'carbs', 'fiber',
+                                           'ingredients', 'tags'])
+    base['ingredients'] = base['ingredients'].apply(ast.literal_eval)
+    base['tags'] = base['tags'].apply(ast.literal_eval)
+
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(scale):
+        part = base.copy()
+        part['id'] = part['id'] + i * len(base)
+        variants = rng.integers(0, 50 * scale, size=len(part))
+        part['tags'] = [tags + [f'varian{v}'] for tags, v in zip(part['tags'], variants)]
+        frames.append(part)
+    return pd.concat(frames, ignore_index=True)
+
+
+def matrix_nbytes(matrix) -> int:
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def time_queries(matrix, queries: int, history: int, seed: int = 0) -> float:
+    """Rata-rata detik per query (cosine history vs seluruh katalog)"""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for _ in range(queries):
+        rows = rng.choice(matrix.shape[0], size=history, replace=False)
+        cosine_similarity(matrix[rows], matrix).mean(axis=0)
+    return (time.perf_counter() - start) / queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dense vs sparse feature matrix benchmark')
+    parser.add_argument('--scale', type=int, default=10, help='Faktor replikasi katalog')
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--history', type=int, default=3)
+    args = parser.parse_args()
+
+    df = load_catalog(args.scale)
+    csr = FeatureEngineer().prepare_features(df)
+    dense = csr.toarray()
+
+    print(f"Katalog: {csr.shape[0]} meals x {csr.shape[1]} fitur (nnz={csr.nnz})")
+    for label, matrix in (('dense', dense), ('sparse', csr)):
+        mb = matrix_nbytes(matrix) / 1024 ** 2
+        latency = time_queries(matrix, args.queries, args.history) * 1000
+        print(f"{label:>6}: {mb:10.2f} MB | {latency:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
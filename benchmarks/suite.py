@@ -0,0 +1,207 @@
+"""Benchmark suite end-to-end pada katalog sintetis (1k - 1M baris).
+
+Mengukur FeatureEngineer.prepare_features, CBFTrainer.train,
+CBFRecommender.load_models / recommend, MealScheduler.generate_schedule dan
+setiap tahap pipeline data, lalu menulis hasilnya sebagai JSON agar dua run
+bisa dibandingkan.
+
+Jalankan dari root repo:
+    python -m benchmarks.suite --sizes 1000 10000 100000
+    python -m benchmarks.suite --sizes 1000000 --only train recommend
+    python -m benchmarks.suite --compare reports/benchmarks/a.json reports/benchmarks/b.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import scipy
+import sklearn
+
+from src.data import ingestion, preprocessing
+from src.models.cbf.feature_engineering import FeatureEngineer
+from src.models.cbf.model import CBFTrainer
+from src.models.cbf.recommender import CBFRecommender
+from src.utils.scheduler import MealScheduler
+from benchmarks.synthetic import generate_raw
+
+BENCHMARKS = ('pipeline', 'prepare_features', 'train', 'load_models', 'recommend', 'schedule')
+MEAL_TYPES = [None, 'Sarapan', 'Makan Siang', 'Makan Malam']
+
+
+def summarize(timings) -> dict:
+    """Statistik detik dari daftar durasi"""
+    timings = np.asarray(timings, dtype=float)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        'runs': int(len(timings)), 'min': float(timings.min()), 'mean': float(timings.mean()),
+        'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(timings.max()),
+    }
+
+
+def timed(func, repeats: int = 1):
+    """Jalankan func beberapa kali, kembalikan (hasil terakhir, list durasi)"""
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def bench_pipeline(raw: pd.DataFrame, workdir: str, chunksize: int) -> dict:
+    """Setiap tahap run_data_pipeline dijalankan di workdir (path relatif pipeline)"""
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        source = 'source_raw.csv'
+        raw.to_csv(source, index=False)
+
+        def ingest():
+            frame = pd.read_csv(source)
+            return frame, ingestion.save_raw_data(frame)
+
+        (df, raw_path), results['ingestion'] = timed(ingest)
+        _, results['profiling_summary'] = timed(lambda: ingestion.save_column_summary(df))
+        for mode in preprocessing.CLEAN_MODES:
+            _, results[f'cleaning_{mode}'] = timed(
+                lambda: preprocessing.save_clean_data(preprocessing.clean_data(df.copy(), mode=mode))
+            )
+        _, results['enrichment'] = timed(
+            lambda: preprocessing.process_nutrition_data(raw_path, preprocessing.PROCESSED_JSON_PATH)
+        )
+        _, results['conversion'] = timed(preprocessing.convertion)
+        _, results['streaming'] = timed(lambda: preprocessing.write_cbf_chunks(
+            preprocessing.convert_chunks(preprocessing.enrich_chunks(preprocessing.clean_chunks(
+                pd.read_csv(raw_path, chunksize=chunksize)
+            ))),
+            'streaming.parquet'
+        ))
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def run_size(rows: int, args) -> list:
+    records = []
+
+    def record(name, timings, **extra):
+        records.append({'benchmark': name, 'rows': rows, 'seconds': summarize(timings), **extra})
+        print(f"  {name:<30} p50 {np.median(timings) * 1000:10.2f} ms ({len(timings)} run)")
+
+    print(f"\n== {rows} baris ==")
+    raw = generate_raw(rows, args.seed)
+    catalog = preprocessing._cbf_frame(preprocessing._normalize_raw(raw))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if 'pipeline' in args.only:
+            for stage, timings in bench_pipeline(raw, tmp, args.chunksize).items():
+                record(f'pipeline.{stage}', timings)
+
+        if 'prepare_features' in args.only:
+            matrix, timings = timed(lambda: FeatureEngineer().prepare_features(catalog.copy()), args.repeats)
+            record('prepare_features', timings, features=int(matrix.shape[1]), nnz=int(matrix.nnz))
+
+        needs_model = {'train', 'load_models', 'recommend', 'schedule'} & set(args.only)
+        if not needs_model:
+            return records
+        model_dir = os.path.join(tmp, 'models')
+        trainer = CBFTrainer(model_dir=model_dir)
+        _, timings = timed(lambda: trainer.train(df=catalog.copy()), 1)
+        if 'train' in args.only:
+            record('train', timings)
+
+        # Constructor sudah memanggil load_models, jadi cukup constructor yang diukur
+        recommender, timings = timed(lambda: CBFRecommender(model_dir=model_dir, cache_size=0), args.repeats)
+        if 'load_models' in args.only:
+            record('load_models', timings)
+
+        rng = np.random.default_rng(args.seed)
+        ids = catalog['id'].to_numpy()
+        if 'recommend' in args.only:
+            timings = []
+            for i in range(args.queries):
+                history = rng.choice(ids, size=3, replace=False).tolist()
+                _, t = timed(lambda: recommender.recommend(history, n=5, meal_type=MEAL_TYPES[i % len(MEAL_TYPES)]))
+                timings += t
+            record('recommend', timings)
+
+        if 'schedule' in args.only:
+            scheduler = MealScheduler(recommender, seed=args.seed)
+            timings = []
+            for _ in range(args.schedules):
+                prefs = {'history': rng.choice(ids, size=3, replace=False).tolist(), 'max_calories': 2000}
+                _, t = timed(lambda: scheduler.generate_schedule(prefs, days=7))
+                timings += t
+            record('schedule', timings)
+    return records
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__,
+                     'scipy': scipy.__version__, 'sklearn': sklearn.__version__},
+    }
+
+
+def compare(base_path: str, new_path: str):
+    """Cetak rasio p50 (base / new) per benchmark & ukuran"""
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+    print(f"{'benchmark':<30} {'rows':>8} {'base p50':>12} {'new p50':>12} {'speedup':>8}")
+    for key in sorted(base.keys() & new.keys(), key=lambda k: (k[1], k[0])):
+        before, after = base[key]['seconds']['p50'], new[key]['seconds']['p50']
+        print(f"{key[0]:<30} {key[1]:>8} {before * 1000:>10.2f}ms {after * 1000:>10.2f}ms "
+              f"{before / after if after else float('inf'):>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite meal-scheduler')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeats', type=int, default=3, help='Pengulangan prepare_features & load_models')
+    parser.add_argument('--queries', type=int, default=200, help='Jumlah query recommend')
+    parser.add_argument('--schedules', type=int, default=20, help='Jumlah jadwal 7 hari')
+    parser.add_argument('--chunksize', type=int, default=10000, help='Chunk untuk tahap streaming')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None,
+                        help='File JSON hasil (default reports/benchmarks/bench-<waktu>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='Bandingkan dua file hasil')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    output = args.output or os.path.join(
+        'reports', 'benchmarks', f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    results = []
+    for rows in args.sizes:
+        results += run_size(rows, args)
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': metadata(), 'params': vars(args), 'results': results}, f, indent=2)
+    print(f"\nHasil ditulis ke {output}")
+
+
+if __name__ == "__main__":
+    main()
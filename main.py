@@ -1,29 +1,78 @@
 import argparse
-from src.models import CBFTrainer, CBFRecommender
-from src.utils.scheduler import MealScheduler
-import pandas as pd
+from src.utils.metrics import METRICS
+
+# Modul berat (pandas, scikit-learn, joblib) diimpor di dalam cabang perintah
+# yang memakainya agar --help dan perintah ringan tetap cepat start
 
 def main():
     parser = argparse.ArgumentParser(description='Meal Recommendation System')
     parser.add_argument('--train', action='store_true', help='Retrain model')
     parser.add_argument('--recommend', nargs='+', type=int, help='Get recommendations')
+    parser.add_argument('--lite', action='store_true', help='Answer --recommend from the bundle with NumPy only')
     parser.add_argument('--schedule', action='store_true', help='Generate schedule')
+    parser.add_argument('--update', metavar='MEALS_CSV', help='Append/update meals without full retrain')
+    parser.add_argument('--ann', action='store_true', help='Build/use approximate (IVF) index')
+    parser.add_argument('--feature-dtype', choices=('float64', 'float32', 'int8'), default='float32',
+                        help='Storage dtype of normalized feature rows written by --train')
+    parser.add_argument('--neighbors', type=int, default=0, metavar='K',
+                        help='Build a top-K item-to-item neighbour table with --train (large catalogs)')
+    parser.add_argument('--mmr-lambda', type=float, default=0.7, metavar='LAMBDA',
+                        help='Relevance vs diversity of scheduled meals (1 = relevance only)')
+    parser.add_argument('--schedule-bulk', metavar='USERS_JSONL', help='Generate schedules for many users')
+    parser.add_argument('--output', default='reports/bulk_schedules.jsonl', help='Output of --schedule-bulk')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --schedule-bulk')
+    parser.add_argument('--serve', action='store_true', help='Run the recommendation server')
+    parser.add_argument('--host', default='127.0.0.1', help='Host for --serve')
+    parser.add_argument('--port', type=int, default=8000, help='Port for --serve')
+    parser.add_argument('--unix-socket', default=None, help='Serve on a Unix socket instead of TCP')
+    parser.add_argument('--batch-window-ms', type=float, default=5.0, help='Micro-batch window for --serve')
+    parser.add_argument('--max-batch', type=int, default=256, help='Max requests per micro-batch')
+    parser.add_argument('--metrics', metavar='PATH', default=None,
+                        help='Collect latency metrics and write them on exit (.prom = Prometheus text, else JSON)')
+    parser.add_argument('--profile-dir', default=None, help='cProfile every recommend call into this folder')
     
     args = parser.parse_args()
-    
+    if args.metrics or args.profile_dir:
+        METRICS.enable(profile_dir=args.profile_dir)
+    try:
+        run(args)
+    finally:
+        if args.metrics:
+            METRICS.write(args.metrics)
+            print(f"Metrics ditulis ke {args.metrics}")
+
+def run(args):
     if args.train:
+        from src.models import CBFTrainer
         print("Training model...")
-        trainer = CBFTrainer('data/processed/nutrition/nutrition_convertion.csv')
+        trainer = CBFTrainer('data/processed/nutrition/nutrition_convertion.parquet', build_ann=args.ann,
+                             feature_dtype=args.feature_dtype, neighbor_k=args.neighbors)
         trainer.train()
     
-    if args.recommend:
-        recommender = CBFRecommender()
+    if args.update:
+        from src.models.cbf.incremental import CatalogUpdater
+        from src.models.cbf.model import load_training_data
+        version = CatalogUpdater().update(load_training_data(args.update))
+        print(f"Katalog diperbarui (bundle {version})")
+
+    if args.recommend and args.lite:
+        from src.models.cbf.lite import BundleSearcher
+        meal_ids, scores = BundleSearcher().recommend(args.recommend)
+        print("\nRecommendations:")
+        for meal_id, score in zip(meal_ids, scores):
+            print(f"  {meal_id:>8}  {score:.4f}")
+    elif args.recommend:
+        from src.models import CBFRecommender
+        recommender = CBFRecommender(use_ann=args.ann)
         recommendations = recommender.recommend(args.recommend)
         print("\nRecommendations:")
         print(recommendations[['id', 'name', 'type', 'calories']])
     
     if args.schedule:
-        scheduler = MealScheduler(CBFRecommender())
+        import pandas as pd
+        from src.models import CBFRecommender
+        from src.utils.scheduler import MealScheduler
+        scheduler = MealScheduler(CBFRecommender(), mmr_lambda=args.mmr_lambda)
         user_prefs = {
             'history': [45, 120, 300],
             'max_calories': 2000
@@ -32,5 +81,23 @@ def main():
         pd.DataFrame(schedule).to_html('reports/meal_schedule.html')
         print("Schedule generated!")
 
+    if args.schedule_bulk:
+        from src.utils.bulk import generate_bulk_schedules
+        summary = generate_bulk_schedules(args.schedule_bulk, args.output, workers=args.workers,
+                                          mmr_lambda=args.mmr_lambda)
+        print(f"Bulk schedule selesai: {summary['succeeded']} sukses, {summary['failed']} gagal -> {args.output}")
+
+    if args.serve:
+        from src.models import CBFRecommender
+        from src.utils.server import run_server
+        run_server(
+            CBFRecommender(use_ann=args.ann),
+            host=args.host,
+            port=args.port,
+            unix_socket=args.unix_socket,
+            batch_window=args.batch_window_ms / 1000,
+            max_batch_size=args.max_batch
+        )
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,21 @@
+import argparse
 import logging
-from ingestion import load_data, save_raw_data, generate_profile_report
-from preprocessing import clean_data, save_clean_data, process_nutrition_data, convertion
+import multiprocessing
+import sys
+from pathlib import Path
+import pandas as pd
+import ingestion
+import preprocessing
+from ingestion import (
+    load_data, load_data_chunks, save_raw_data, save_raw_chunks, generate_profile_report, save_column_summary,
+    RAW_DATA_PATH, RAW_SAVE_DIR, PROFILE_PATH, SUMMARY_PATH, PROFILE_MODES
+)
+from preprocessing import (
+    clean_data, save_clean_data, process_nutrition_data, convertion,
+    clean_chunks, enrich_chunks, convert_chunks, write_cbf_chunks,
+    CLEAN_SAVE_DIR, CLEAN_MODES, PROCESSED_JSON_PATH, CBF_PATH
+)
+from stage_cache import StageCache, code_fingerprint
 
 logging.basicConfig(
     level=logging.INFO,
@@ -8,34 +23,112 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_data_pipeline():
-    """Pipeline end-to-end: raw -> clean -> enriched"""
+RAW_PATH = str(RAW_SAVE_DIR / "nutrition_raw.csv")
+CLEAN_PATH = str(CLEAN_SAVE_DIR / "nutrition_clean.parquet")
+
+def _stage_code(stage: str) -> str:
+    return code_fingerprint(*ingestion.STAGE_CODE.get(stage, ()), *preprocessing.STAGE_CODE.get(stage, ()))
+
+def _profiling_args(mode: str, sample_rows: int) -> dict:
+    return {
+        'inputs': [RAW_PATH],
+        'outputs': [SUMMARY_PATH if mode == 'summary' else PROFILE_PATH],
+        'params': {'mode': mode, 'sample_rows': sample_rows if mode == 'sampled' else None},
+        'code': _stage_code('profiling'),
+    }
+
+def run_profiling_stage(mode: str, sample_rows: int = 10000, force: bool = False, raw_df=None, cache=None):
+    """Jalankan tahap profiling (lewat cache); dipakai juga sebagai target proses background"""
+    cache = cache if cache is not None else StageCache(force=force)
+
+    def profile():
+        df = raw_df() if raw_df is not None else pd.read_csv(RAW_PATH)
+        if mode == 'summary':
+            save_column_summary(df)
+        else:
+            generate_profile_report(df, mode=mode, sample_rows=sample_rows)
+
+    return cache.run('profiling', profile, **_profiling_args(mode, sample_rows))
+
+def run_data_pipeline(streaming: bool = False, chunksize: int = 10000, force: bool = False,
+                      profile_mode: str = 'full', profile_sample_rows: int = 10000,
+                      profile_background: bool = True, clean_mode: str = 'vectorized', metrics=None):
+    """
+    Pipeline end-to-end: raw -> clean -> enriched
+
+    Setiap tahap di-cache berdasarkan hash input, parameter & kodenya
+    (record di data/processed/stages), sehingga rerun hanya menjalankan
+    tahap yang inputnya atau aturannya berubah beserta tahap sesudahnya.
+
+    Args:
+        streaming: Proses raw CSV per chunk (clean -> enrich -> convert
+            sebagai generator) dan tulis output bertahap, memori tetap datar
+            berapa pun ukuran input
+        chunksize: Jumlah baris per chunk pada mode streaming
+        force: Jalankan ulang semua tahap tanpa melihat cache
+        profile_mode: Salah satu PROFILE_MODES ('off', 'summary', 'minimal',
+            'sampled', 'full')
+        profile_sample_rows: Jumlah baris untuk profile_mode 'sampled'
+        profile_background: Mode 'full' dijalankan di proses terpisah agar
+            tidak menahan tahap berikutnya
+        clean_mode: 'vectorized' (satu pass, mask outlier gabungan) atau
+            'compat' (filter outlier berurutan per kolom seperti dulu)
+        metrics: Registry opsional untuk timer per tahap (lihat StageCache)
+    """
+    if profile_mode not in PROFILE_MODES:
+        raise ValueError(f"profile_mode harus salah satu dari {PROFILE_MODES}")
+    cache = StageCache(force=force, metrics=metrics)
+    if streaming:
+        return run_streaming_pipeline(chunksize, cache)
     try:
         logger.info("Memulai seluruh pipeline data...")
+        frames = {}
+
+        def raw_df():
+            # Data raw hanya dibaca sekali per run, dan hanya bila ada tahap yang butuh
+            if 'raw' not in frames:
+                frames['raw'] = pd.read_csv(RAW_PATH)
+            return frames['raw']
+
+        def ingest():
+            frames['raw'] = load_data()
+            save_raw_data(frames['raw'])
         
         # [1] Tahap Ingestion
         logger.info("\n=== TAHAP INGESTION ===")
-        raw_df = load_data()
-        raw_path = save_raw_data(raw_df)
-        generate_profile_report(raw_df)
+        cache.run('ingestion', ingest, inputs=[RAW_DATA_PATH], outputs=[RAW_PATH],
+                  code=_stage_code('ingestion'))
+        if profile_mode == 'off':
+            logger.info("Profiling dimatikan")
+        elif profile_mode == 'full' and profile_background:
+            if not cache.cached('profiling', **_profiling_args(profile_mode, profile_sample_rows)):
+                profiler = multiprocessing.Process(
+                    target=run_profiling_stage, args=(profile_mode, profile_sample_rows, force), name='profiling'
+                )
+                profiler.start()
+                logger.info(f"Profiling penuh berjalan di background (pid {profiler.pid}) -> {PROFILE_PATH}")
+        else:
+            run_profiling_stage(profile_mode, profile_sample_rows, raw_df=raw_df, cache=cache)
         
         # [2] Tahap Cleaning
         logger.info("\n=== TAHAP CLEANING ===")
-        clean_df = clean_data(raw_df)
-        save_clean_data(clean_df)
+        cache.run('cleaning', lambda: save_clean_data(clean_data(raw_df().copy(), mode=clean_mode)),
+                  inputs=[RAW_PATH], outputs=[CLEAN_PATH], params={'mode': clean_mode},
+                  code=_stage_code('cleaning'))
         
         # [3] Tahap Enrichment (Preprocessing)
         logger.info("\n=== TAHAP ENRICHMENT ===")
-        process_nutrition_data(
-            csv_path=raw_path,
-            output_path="data/processed/nutrition/nutrition_processed.json"
-        )
+        cache.run('enrichment', lambda: process_nutrition_data(csv_path=RAW_PATH, output_path=PROCESSED_JSON_PATH),
+                  inputs=[RAW_PATH], outputs=[PROCESSED_JSON_PATH], code=_stage_code('enrichment'))
 
         # [4] Tahap Convertion
         logger.info("\n=== TAHAP KONVERSI ===")
-        convert_path = convertion()
+        cache.run('conversion', convertion, inputs=[PROCESSED_JSON_PATH], outputs=[CBF_PATH],
+                  code=_stage_code('conversion'))
+        convert_path = CBF_PATH
         
         logger.info("\nPipeline berhasil!")
+        cache.summary()
         logger.info(f"Output akhir: {convert_path}")
         return convert_path
         
@@ -43,5 +136,66 @@ def run_data_pipeline():
         logger.error(f"Pipeline gagal: {str(e)}")
         raise
 
+def run_streaming_pipeline(chunksize: int = 10000, cache: StageCache = None):
+    """
+    Pipeline streaming: setiap chunk raw langsung dibersihkan, di-enrich dan
+    ditulis ke file CBF tanpa file JSON perantara
+
+    Profiling dan cleaning statistik (median, outlier IQR) butuh seluruh
+    data sekaligus sehingga tidak dijalankan di mode ini; file CBF yang
+    dihasilkan sama dengan mode biasa. Seluruh aliran di-cache sebagai satu
+    tahap.
+    """
+    cache = cache if cache is not None else StageCache()
+    try:
+        logger.info(f"Memulai pipeline data streaming (chunk {chunksize} baris)...")
+
+        def stream():
+            chunks = save_raw_chunks(load_data_chunks(chunksize))
+            rows = write_cbf_chunks(convert_chunks(enrich_chunks(clean_chunks(chunks))), CBF_PATH)
+            logger.info(f"{rows} baris diproses")
+
+        # chunksize tidak mengubah output sehingga bukan bagian dari kunci cache
+        cache.run('streaming', stream, inputs=[RAW_DATA_PATH], outputs=[RAW_PATH, CBF_PATH],
+                  code=_stage_code('streaming'))
+        convert_path = CBF_PATH
+
+        logger.info("\nPipeline berhasil!")
+        cache.summary()
+        logger.info(f"Output akhir: {convert_path}")
+        return convert_path
+
+    except Exception as e:
+        logger.error(f"Pipeline gagal: {str(e)}")
+        raise
+
 if __name__ == "__main__":
-    run_data_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Pipeline data nutrisi')
+    parser.add_argument('--stream', action='store_true', help='Proses raw CSV per chunk')
+    parser.add_argument('--chunksize', type=int, default=10000, help='Baris per chunk untuk --stream')
+    parser.add_argument('--force', action='store_true', help='Abaikan cache tahap, jalankan ulang semua tahap')
+    parser.add_argument('--profile', choices=PROFILE_MODES, default='full', help='Mode profiling data raw')
+    parser.add_argument('--profile-sample-rows', type=int, default=10000, help='Baris untuk --profile sampled')
+    parser.add_argument('--profile-foreground', action='store_true',
+                        help='Jalankan --profile full di proses utama (default di background)')
+    parser.add_argument('--clean-mode', choices=CLEAN_MODES, default='vectorized',
+                        help='compat = filter outlier berurutan per kolom seperti versi lama')
+    parser.add_argument('--metrics', metavar='PATH', default=None,
+                        help='Tulis timer per tahap saat selesai (.prom = teks Prometheus, selain itu JSON)')
+    args = parser.parse_args()
+
+    metrics = None
+    if args.metrics:
+        # Script dijalankan langsung (src/data di sys.path), root repo ditambahkan untuk src.utils
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+        from src.utils.metrics import METRICS as metrics
+        metrics.enable()
+    try:
+        run_data_pipeline(streaming=args.stream, chunksize=args.chunksize, force=args.force,
+                          profile_mode=args.profile, profile_sample_rows=args.profile_sample_rows,
+                          profile_background=not args.profile_foreground, clean_mode=args.clean_mode,
+                          metrics=metrics)
+    finally:
+        if metrics is not None:
+            metrics.write(args.metrics)
+            logger.info(f"Metrics ditulis ke {args.metrics}")
\ No newline at end of file
@@ -1,8 +1,11 @@
+import json
+import warnings
 import pandas as pd
-from ydata_profiling import ProfileReport
+import numpy as np
 import os
 from pathlib import Path
 import logging
+from typing import Iterable, Iterator
 
 # Configure logger
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +15,12 @@ logger = logging.getLogger(__name__)
 RAW_DATA_PATH = r"/meal-scheduler/data/raw/nutrition_raw.csv"
 RAW_SAVE_DIR = Path("data/raw/nutrition")
 PROFILE_REPORT_DIR = Path("reports")
+PROFILE_PATH = str(PROFILE_REPORT_DIR / "nutrition_profile.html")
+SUMMARY_PATH = str(PROFILE_REPORT_DIR / "nutrition_summary.json")
+
+# off: tanpa profiling | summary: statistik kolom bawaan (cepat)
+# minimal / sampled / full: ProfileReport ydata (minimal, sampel baris, explorative penuh)
+PROFILE_MODES = ('off', 'summary', 'minimal', 'sampled', 'full')
 
 def load_data() -> pd.DataFrame:
     """Load raw data from specified path"""
@@ -24,6 +33,11 @@ def load_data() -> pd.DataFrame:
         logger.error(f"Gagal memuat data: {str(e)}")
         raise
 
+def load_data_chunks(chunksize: int = 10000) -> Iterator[pd.DataFrame]:
+    """Load raw data per chunk tanpa memuat seluruh file ke memori"""
+    logger.info(f"Memuat data dari {RAW_DATA_PATH} per {chunksize} baris")
+    yield from pd.read_csv(RAW_DATA_PATH, chunksize=chunksize)
+
 def validate_data(df: pd.DataFrame) -> bool:
     """Lakukan validasi dasar data"""
     validation_passed = True
@@ -55,20 +69,115 @@ def save_raw_data(df: pd.DataFrame) -> str:
         logger.error(f"Gagal menyimpan data mentah: {str(e)}")
         raise
 
-def generate_profile_report(df: pd.DataFrame) -> str:
-    """Generate data profiling report"""
+def save_raw_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Simpan chunk mentah secara bertahap sambil meneruskannya ke tahap berikutnya"""
+    RAW_SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    save_path = RAW_SAVE_DIR / "nutrition_raw.csv"
+    tmp_path = RAW_SAVE_DIR / "nutrition_raw.csv.tmp"
+    rows = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=rows == 0)
+            rows += len(chunk)
+            yield chunk
+    os.replace(tmp_path, save_path)
+    logger.info(f"Data mentah disimpan di {save_path} ({rows} baris)")
+
+def column_summary(df: pd.DataFrame) -> dict:
+    """
+    Statistik per kolom tanpa ydata: semua kolom numerik dihitung sekaligus
+    dalam satu pass vektor (missing, mean, std, min, kuartil, max, nol),
+    kolom lain cukup missing, unique & nilai terbanyak
+    """
+    num_cols = df.select_dtypes(include=np.number).columns
+    values = df[num_cols].to_numpy(dtype=float)
+    missing = np.isnan(values).sum(axis=0)
+    with warnings.catch_warnings():
+        # Kolom yang seluruhnya NaN menghasilkan NaN, bukan error
+        warnings.simplefilter('ignore', RuntimeWarning)
+        quantiles = np.nanpercentile(values, [0, 25, 50, 75, 100], axis=0)
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+    zeros = (values == 0).sum(axis=0)
+
+    columns = {}
+    for j, col in enumerate(num_cols):
+        stats = {
+            'missing': missing[j], 'mean': means[j], 'std': stds[j], 'min': quantiles[0, j],
+            'q25': quantiles[1, j], 'median': quantiles[2, j], 'q75': quantiles[3, j],
+            'max': quantiles[4, j], 'zeros': zeros[j]
+        }
+        columns[col] = {
+            key: None if np.isnan(value) else (int(value) if key in ('missing', 'zeros') else float(value))
+            for key, value in stats.items()
+        }
+    for col in df.columns.difference(num_cols, sort=False):
+        counts = df[col].value_counts()
+        columns[col] = {
+            'missing': int(df[col].isna().sum()),
+            'unique': int(len(counts)),
+            'top': None if counts.empty else str(counts.index[0]),
+            'top_count': None if counts.empty else int(counts.iloc[0]),
+        }
+    return {
+        'rows': int(len(df)),
+        'duplicate_rows': int(df.duplicated().sum()),
+        'columns': columns,
+    }
+
+def save_column_summary(df: pd.DataFrame) -> str:
+    """Simpan column_summary sebagai JSON (pengganti profiling untuk run cepat)"""
+    try:
+        PROFILE_REPORT_DIR.mkdir(exist_ok=True)
+        with open(SUMMARY_PATH, 'w', encoding='utf-8') as f:
+            json.dump(column_summary(df), f, ensure_ascii=False, indent=2)
+        logger.info(f"Ringkasan kolom disimpan di {SUMMARY_PATH}")
+        return str(SUMMARY_PATH)
+    except Exception as e:
+        logger.error(f"Gagal membuat ringkasan kolom: {str(e)}")
+        raise
+
+def generate_profile_report(df: pd.DataFrame, mode: str = 'full', sample_rows: int = 10000) -> str:
+    """
+    Generate data profiling report
+
+    Args:
+        df: Data raw
+        mode: 'minimal' (ProfileReport minimal), 'sampled' (explorative pada
+            sample_rows baris acak) atau 'full' (explorative seluruh data)
+        sample_rows: Jumlah baris untuk mode 'sampled'
+    """
     try:
+        # Import di sini: ydata_profiling berat dan hanya dibutuhkan mode ini
+        from ydata_profiling import ProfileReport
+
         PROFILE_REPORT_DIR.mkdir(exist_ok=True)
-        report_path = PROFILE_REPORT_DIR / "nutrition_profile.html"
+        report_path = PROFILE_PATH
+        title = "Nutrition Data Profiling"
+        options = {'explorative': True}
+        if mode == 'minimal':
+            options = {'minimal': True}
+        elif mode == 'sampled' and len(df) > sample_rows:
+            df = df.sample(n=sample_rows, random_state=42)
+            title = f"{title} (sampel {sample_rows} baris)"
+        elif mode not in ('sampled', 'full'):
+            raise ValueError(f"Mode profiling tidak dikenal: {mode}")
         
         profile = ProfileReport(  # Gunakan dari ydata_profiling
             df,
-            title="Nutrition Data Profiling",
-            explorative=True
+            title=title,
+            **options
         )
         profile.to_file(report_path)
         logger.info(f"Profiling report generated: {report_path}")
         return str(report_path)
     except Exception as e:
         logger.error(f"Gagal membuat profiling report: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+# Fingerprint kode per tahap untuk cache tahap di data_pipeline
+STAGE_CODE = {
+    'ingestion': (RAW_DATA_PATH, load_data, save_raw_data),
+    'profiling': (generate_profile_report, column_summary, save_column_summary),
+    'streaming': (RAW_DATA_PATH, load_data_chunks, save_raw_chunks),
+}
@@ -1,19 +1,47 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 import logging
+import os
 import json
 import csv
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
 CLEAN_SAVE_DIR = Path("data/processed/nutrition")
+PROCESSED_JSON_PATH = "data/processed/nutrition/nutrition_processed.json"
+CBF_PATH = "data/processed/nutrition/nutrition_convertion.parquet"
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Lakukan preprocessing data"""
+CLEAN_MODES = ('vectorized', 'compat')
+
+def clean_data(df: pd.DataFrame, mode: str = 'vectorized') -> pd.DataFrame:
+    """Lakukan preprocessing data (lihat clean_data_with_stats)"""
+    return clean_data_with_stats(df, mode)[0]
+
+def clean_data_with_stats(df: pd.DataFrame, mode: str = 'vectorized') -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Lakukan preprocessing data dan kembalikan statistik per kolom
+
+    Args:
+        df: Data raw
+        mode: 'vectorized' (median, modus & kuartil semua kolom dihitung
+            sekaligus, outlier dibuang dengan satu mask gabungan sehingga
+            hasilnya tidak bergantung urutan kolom) atau 'compat' (perilaku
+            lama: filter outlier berurutan per kolom)
+
+    Returns:
+        Tuple: (DataFrame bersih, statistik: kolom yang dibuang, jumlah nilai
+        yang diisi & jumlah baris outlier per kolom, duplikat, jumlah baris)
+    """
+    if mode not in CLEAN_MODES:
+        raise ValueError(f"Mode cleaning tidak dikenal: {mode}")
     try:
-        logger.info("Memulai proses cleaning data...")
+        logger.info(f"Memulai proses cleaning data (mode {mode})...")
+        rows_in = len(df)
         
         # 1. Standardisasi nama kolom
         df.columns = [col.lower().replace(' ', '_') for col in df.columns]
@@ -24,19 +52,39 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         })
 
         # 2. Handle missing values
-        df = handle_missing_values(df)
+        if mode == 'compat':
+            filled = df.isna().sum()
+            df = handle_missing_values(df)
+            dropped_columns = [col for col in filled.index if col not in df.columns]
+            filled = filled[df.columns]
+        else:
+            df, dropped_columns, filled = handle_missing_values_vectorized(df)
         
         # 3. Hapus duplikat
+        rows_before = len(df)
         df = df.drop_duplicates()
+        duplicates = rows_before - len(df)
         
         # 4. Konversi tipe data
         df = convert_data_types(df)
         
         # 5. Handle outliers
-        df = handle_outliers(df)
-        
-        logger.info("Cleaning data selesai!")
-        return df
+        if mode == 'compat':
+            df, outliers = handle_outliers_with_counts(df)
+        else:
+            df, outliers = handle_outliers_vectorized(df)
+
+        stats = {
+            'mode': mode,
+            'rows_in': rows_in,
+            'dropped_columns': dropped_columns,
+            'filled': {col: int(n) for col, n in filled.items() if n},
+            'duplicates': int(duplicates),
+            'outliers': {col: int(n) for col, n in outliers.items()},
+            'rows_out': len(df),
+        }
+        logger.info(f"Cleaning data selesai! {rows_in} -> {len(df)} baris, outlier per kolom: {stats['outliers']}")
+        return df, stats
     except Exception as e:
         logger.error(f"Gagal cleaning data: {str(e)}")
         raise
@@ -59,6 +107,33 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
+def handle_missing_values_vectorized(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str], pd.Series]:
+    """
+    Sama dengan handle_missing_values, tetapi median & modus semua kolom
+    yang punya nilai kosong dihitung sekaligus lalu diisi dengan satu fillna
+
+    Returns:
+        Tuple: (DataFrame, kolom yang dibuang, jumlah nilai kosong per kolom)
+    """
+    # Drop kolom dengan >50% missing
+    missing = df.isna().sum()
+    keep = missing[len(df) - missing >= len(df) * 0.5].index
+    dropped_columns = [col for col in df.columns if col not in keep]
+    df = df[keep]
+    missing = missing[keep]
+
+    incomplete = missing[missing > 0].index
+    num_cols = df[incomplete].select_dtypes(include=np.number).columns
+    cat_cols = incomplete.difference(num_cols, sort=False)
+    fills = {}
+    if len(num_cols):
+        fills.update(df[num_cols].median().to_dict())
+    if len(cat_cols):
+        fills.update(df[cat_cols].mode().iloc[0].to_dict())
+    if fills:
+        df = df.fillna(fills)
+    return df, dropped_columns, missing
+
 def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """Konversi tipe data kolom"""
     # Contoh: Konversi kolom tanggal jika ada
@@ -68,7 +143,13 @@ def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
 
 def handle_outliers(df: pd.DataFrame) -> pd.DataFrame:
     """Handle outliers dengan IQR method"""
+    return handle_outliers_with_counts(df)[0]
+
+def handle_outliers_with_counts(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Handle outliers dengan IQR method per kolom secara berurutan (perilaku
+    lama); jumlah baris yang dibuang dicatat per kolom"""
     num_cols = df.select_dtypes(include=np.number).columns
+    counts = {}
     
     for col in num_cols:
         q1 = df[col].quantile(0.25)
@@ -77,9 +158,35 @@ def handle_outliers(df: pd.DataFrame) -> pd.DataFrame:
         lower_bound = q1 - 1.5*iqr
         upper_bound = q3 + 1.5*iqr
         
+        rows_before = len(df)
         df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
+        counts[col] = rows_before - len(df)
     
-    return df
+    return df, counts
+
+def handle_outliers_vectorized(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Handle outliers dengan IQR method: kuartil semua kolom numerik dihitung
+    dari data yang sama dalam satu pass, lalu baris dibuang sekali dengan
+    mask gabungan
+
+    Returns:
+        Tuple: (DataFrame, jumlah baris di luar batas IQR per kolom; satu
+        baris bisa terhitung di beberapa kolom)
+    """
+    num_cols = df.select_dtypes(include=np.number).columns
+    if len(num_cols) == 0 or len(df) == 0:
+        return df, {col: 0 for col in num_cols}
+
+    quartiles = df[num_cols].quantile([0.25, 0.75]).to_numpy()
+    iqr = quartiles[1] - quartiles[0]
+    lower_bound = quartiles[0] - 1.5*iqr
+    upper_bound = quartiles[1] + 1.5*iqr
+
+    values = df[num_cols].to_numpy(dtype=float)
+    inside = (values >= lower_bound) & (values <= upper_bound)
+    counts = dict(zip(num_cols, (~inside).sum(axis=0).tolist()))
+    return df[inside.all(axis=1)], counts
 
 def save_clean_data(df: pd.DataFrame) -> str:
     """Simpan data yang sudah dibersihkan"""
@@ -93,31 +200,210 @@ def save_clean_data(df: pd.DataFrame) -> str:
         logger.error(f"Gagal menyimpan data bersih: {str(e)}")
         raise
 
+# Kata kunci enrichment, dipakai oleh fungsi per-baris maupun KeywordMatcher
+BREAKFAST_KEYWORDS = [
+    'sarapan', 'bubur', 'sereal', 'roti', 'pancake', 
+    'waffle', 'telur', 'oatmeal', 'yogurt', 'smoothie',
+    'buah', 'jus', 'susu', 'kopi', 'teh'
+]
+LUNCH_KEYWORDS = [
+    'nasi', 'ayam', 'daging', 'ikan', 'sup', 'soto',
+    'gado-gado', 'pecel', 'rawon', 'bakso', 'mie', 'sate',
+    'tumis', 'capcai', 'sayur', 'gado', 'pecel'
+]
+DINNER_KEYWORDS = [
+    'steak', 'rendang', 'gulai', 'kambing', 'bebek',
+    'sop buntut', 'iga bakar', 'martabak', 'pasta',
+    'lasagna', 'pizza', 'kari'
+]
+
+INGREDIENT_KEYWORDS = {
+    # Buah-buahan
+    'apel': ['apel'], 'pisang': ['pisang'], 'jeruk': ['jeruk'],
+    'mangga': ['mangga'], 'anggur': ['anggur'], 'pepaya': ['pepaya'],
+    'semangka': ['semangka'], 'melon': ['melon'], 'nanas': ['nanas'],
+    'stroberi': ['stroberi'], 'buah': ['buah'], 'alpukat': ['alpukat'],
+    
+    # Protein
+    'ayam': ['ayam', 'bumbu'], 'sapi': ['daging sapi', 'bumbu'], 'babi': ['babi', 'bumbu'],
+    'ikan': ['ikan', 'bumbu'], 'udang': ['udang', 'bumbu'], 'telur': ['telur', 'bumbu'],
+    'bebek': ['bebek', 'bumbu'], 'kambing': ['kambing', 'bumbu'], 'burung': ['burung', 'bumbu'],
+    'domba': ['domba', 'bumbu'], 'angsa': ['angsa', 'bumbu'], 'belibing': ['belibing', 'bumbu'],
+    'kerang': ['kerang', 'bumbu'], 'cumi': ['cumi', 'bumbu'], 'kepiting': ['kepiting', 'bumbu'],
+    
+    
+    # Sayuran
+    'sayur': ['sayuran'], 'kangkung': ['kangkung'],
+    'bayam': ['bayam'], 'wortel': ['wortel'], 'brokoli': ['brokoli'],
+    
+    # Karbohidrat
+    'nasi': ['beras'], 'mie': ['tepung terigu'],
+    'roti': ['tepung terigu'], 'kentang': ['kentang'], 'jagung': ['jagung']
+}
+DEFAULT_INGREDIENTS = ['bahan utama', 'bumbu']
+
+SNACK_KEYWORDS = ['kue', 'biskuit', 'keripik', 'kerupuk', 'camilan']
+COOKING_METHODS = {
+    'goreng': 'goreng', 
+    'bakar': 'bakar', 
+    'rebus': 'rebus', 
+    'kukus': 'kukus',
+    'panggang': 'panggang', 
+    'tumis': 'tumis',
+    'kuah': 'berkuah'
+}
+# Urutan sama dengan urutan pengecekan di generate_tags
+FLAVOR_KEYWORDS = [
+    ('pedas', ['pedas', 'rica', 'balado']),
+    ('manis', ['manis']),
+    ('asin', ['asin']),
+    ('asam', ['asam']),
+]
+CATEGORY_KEYWORDS = [
+    ('daging', ['ayam', 'sapi', 'kambing', 'daging']),
+    ('seafood', ['ikan', 'udang', 'cumi', 'kerang', 'kepiting', 'seafood']),
+    ('nabati', ['tahu', 'tempe', 'kacang', 'kedelai']),
+    ('sayuran', ['sayur', 'kangkung', 'bayam', 'wortel', 'brokoli']),
+]
+CULTURAL_INDICATORS = {
+    'padang': 'padang',
+    'jawa': 'jawa',
+    'sunda': 'sunda',
+    'bali': 'bali',
+    'aceh': 'aceh',
+    'manado': 'manado',
+    'minang': 'minang'
+}
+TRADITIONAL_DISHES = ['nasi goreng', 'soto', 'rendang', 'sate', 'gado-gado', 'pecel', 'rawon', 
+                      'bakso', 'mie goreng', 'gudeg', 'opor', 'ketoprak', 'pempek']
+HIGH_FIBER_INDICATORS = ['sayur', 'kacang', 'biji', 'buah', 'sereal', 'oat', 'brokoli', 
+                         'kangkung', 'bayam', 'wortel', 'apel', 'pisang', 'pepaya']
+
+
+class KeywordMatcher:
+    """Pencocok banyak keyword sekaligus dengan satu regex terkompilasi.
+
+    Regex lookahead `(?=(kw1|kw2|...))` (keyword terpanjang dulu) menemukan
+    keyword terpanjang yang dimulai di setiap posisi dalam satu kali scan.
+    Keyword lain yang dimulai di posisi yang sama pasti substring dari
+    keyword terpanjang tersebut, jadi hasil akhirnya dilengkapi lewat matriks
+    implikasi substring. Hasilnya identik dengan `keyword in name_lower`
+    untuk setiap keyword.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.index = {keyword: i for i, keyword in enumerate(self.keywords)}
+        alternation = '|'.join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self.pattern = re.compile(f'(?=({alternation}))')
+
+        # implies[a, b] = True bila keyword b substring dari keyword a
+        self.implies = np.array(
+            [[b in a for b in self.keywords] for a in self.keywords], dtype=np.float32
+        )
+
+    def match(self, names: pd.Series) -> np.ndarray:
+        """Matriks boolean (baris x keyword): keyword ada di nama (lowercase)"""
+        found = names.str.lower().str.findall(self.pattern).explode().dropna()
+        direct = np.zeros((len(names), len(self.keywords)), dtype=np.float32)
+        direct[found.index.to_numpy(), found.map(self.index).to_numpy(dtype=np.intp)] = 1
+        return (direct @ self.implies) > 0
+
+    def any_of(self, hits: np.ndarray, keywords) -> np.ndarray:
+        """Mask baris yang memuat salah satu keyword"""
+        return hits[:, [self.index[k] for k in keywords]].any(axis=1)
+
+
+_MATCHER = KeywordMatcher(
+    BREAKFAST_KEYWORDS + LUNCH_KEYWORDS + DINNER_KEYWORDS + list(INGREDIENT_KEYWORDS)
+    + SNACK_KEYWORDS + list(COOKING_METHODS) + [k for _, kws in FLAVOR_KEYWORDS for k in kws]
+    + [k for _, kws in CATEGORY_KEYWORDS for k in kws] + list(CULTURAL_INDICATORS)
+    + TRADITIONAL_DISHES + HIGH_FIBER_INDICATORS
+)
+
+
+def _lists_per_pattern(mask: np.ndarray, build) -> List[list]:
+    """Bangun list per baris dari kolom mask yang aktif, sekali per pola unik"""
+    # Pola dikemas menjadi kunci uint64 (64 kolom per kunci) agar unique cepat
+    packed = np.packbits(mask, axis=1)
+    packed = np.pad(packed, ((0, 0), (0, -packed.shape[1] % 8)))
+    keys = np.ascontiguousarray(packed).view(np.uint64)
+    if keys.shape[1] == 1:
+        _, first, inverse = np.unique(keys[:, 0], return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    built = [build(np.flatnonzero(mask[row])) for row in first]
+    return [list(built[i]) for i in inverse.ravel()]
+
+
+def enrich_columns(names: pd.Series, calories: pd.Series, protein: pd.Series,
+                   fat: pd.Series, carbs: pd.Series) -> pd.DataFrame:
+    """Versi vektor dari estimate_meal_type, extract_ingredients, generate_tags
+    dan estimate_fiber: setiap nama hanya di-scan sekali oleh KeywordMatcher"""
+    names = names.reset_index(drop=True).astype(str)
+    calories = calories.to_numpy(dtype=float)
+    protein = protein.to_numpy(dtype=float)
+    fat = fat.to_numpy(dtype=float)
+    carbs = carbs.to_numpy(dtype=float)
+    hits = _MATCHER.match(names)
+    any_of = _MATCHER.any_of
+
+    # 1. Meal type
+    meal_type = np.select(
+        [any_of(hits, BREAKFAST_KEYWORDS) | (calories < 300),
+         any_of(hits, DINNER_KEYWORDS) | (calories > 600)],
+        ['Sarapan', 'Makan Malam'],
+        default='Makan Siang'
+    )
+
+    # 2. Ingredients
+    ingredient_items = list(INGREDIENT_KEYWORDS.values())
+    ingredient_hits = hits[:, [_MATCHER.index[k] for k in INGREDIENT_KEYWORDS]]
+    ingredients = _lists_per_pattern(ingredient_hits, lambda columns: list(dict.fromkeys(
+        item for j in columns for item in ingredient_items[j]
+    )) or list(DEFAULT_INGREDIENTS))
+
+    # 3. Tags, kolom disusun sesuai urutan append di generate_tags
+    cultural_hits = hits[:, [_MATCHER.index[k] for k in CULTURAL_INDICATORS]]
+    # Hanya indikator budaya pertama yang dipakai (break di generate_tags)
+    cultural_first = cultural_hits & (np.cumsum(cultural_hits, axis=1) == 1)
+    traditional = cultural_hits.any(axis=1) | any_of(hits, TRADITIONAL_DISHES)
+
+    tag_names = ['camilan'] + list(COOKING_METHODS.values()) + [tag for tag, _ in FLAVOR_KEYWORDS] \
+        + [tag for tag, _ in CATEGORY_KEYWORDS] + [
+            'protein tinggi', 'rendah lemak', 'tinggi lemak', 'rendah karbo', 'tinggi karbo',
+            'rendah kalori', 'tinggi kalori'
+        ] + list(CULTURAL_INDICATORS.values()) + ['tradisional']
+    tag_columns = np.column_stack(
+        [any_of(hits, SNACK_KEYWORDS)]
+        + [hits[:, _MATCHER.index[method]] for method in COOKING_METHODS]
+        + [any_of(hits, kws) for _, kws in FLAVOR_KEYWORDS]
+        + [any_of(hits, kws) for _, kws in CATEGORY_KEYWORDS]
+        + [protein >= 15, fat < 5, fat > 15, carbs < 10, carbs > 30, calories < 200, calories > 400]
+        + [cultural_first, traditional]
+    )
+    tags = _lists_per_pattern(tag_columns, lambda columns: [tag_names[j] for j in columns])
+
+    # 4. Fiber
+    fiber = carbs * 0.05 * np.where(any_of(hits, HIGH_FIBER_INDICATORS), 2, 1)
+    fiber = np.minimum(np.maximum(fiber, 0.5), carbs * 0.4)
+
+    return pd.DataFrame({
+        'type': meal_type,
+        'ingredients': ingredients,
+        'tags': tags,
+        'fiber': [round(value, 1) for value in fiber.tolist()],
+    })
+
 def enrich_data(df: pd.DataFrame) -> pd.DataFrame:
     """Tambahkan fitur: meal_type, ingredients, tags, fiber"""
     try:
         logger.info("Memulai proses enrichment data...")
         
-        # 1. Generate meal type
-        df['type'] = df.apply(
-            lambda row: estimate_meal_type(row['name'], row['calories'], row['carbs']),
-            axis=1
-        )
-        
-        # 2. Extract ingredients
-        df['ingredients'] = df['name'].apply(extract_ingredients)
-        
-        # 3. Generate tags
-        df['tags'] = df.apply(
-            lambda row: generate_tags(row['name'], row['calories'], row['protein'], row['fat'], row['carbs']),
-            axis=1
-        )
-        
-        # 4. Estimate fiber
-        df['fiber'] = df.apply(
-            lambda row: estimate_fiber(row['name'], row['carbs']),
-            axis=1
-        )
+        # Satu scan keyword per nama, sisanya operasi kolom
+        enriched = enrich_columns(df['name'], df['calories'], df['protein'], df['fat'], df['carbs'])
+        for column in ('type', 'ingredients', 'tags', 'fiber'):
+            df[column] = enriched[column].to_numpy()
         
         logger.info("Enrichment data selesai!")
         return df
@@ -129,32 +415,14 @@ def estimate_meal_type(name: str, calories: float, carbs: float) -> str:
     name_lower = name.lower()
     
     # Sarapan: Makanan ringan atau khas pagi hari
-    breakfast_keywords = [
-        'sarapan', 'bubur', 'sereal', 'roti', 'pancake', 
-        'waffle', 'telur', 'oatmeal', 'yogurt', 'smoothie',
-        'buah', 'jus', 'susu', 'kopi', 'teh'
-    ]
-    
     # Makan Siang: Makanan utama dengan kalori sedang
-    lunch_keywords = [
-        'nasi', 'ayam', 'daging', 'ikan', 'sup', 'soto',
-        'gado-gado', 'pecel', 'rawon', 'bakso', 'mie', 'sate',
-        'tumis', 'capcai', 'sayur', 'gado', 'pecel'
-    ]
-    
     # Makan Malam: Makanan berat atau tinggi kalori
-    dinner_keywords = [
-        'steak', 'rendang', 'gulai', 'kambing', 'bebek',
-        'sop buntut', 'iga bakar', 'martabak', 'pasta',
-        'lasagna', 'pizza', 'kari'
-    ]
-    
     # Kategori berdasarkan kalori
-    if any(keyword in name_lower for keyword in breakfast_keywords) or calories < 300:
+    if any(keyword in name_lower for keyword in BREAKFAST_KEYWORDS) or calories < 300:
         return "Sarapan"
-    elif any(keyword in name_lower for keyword in dinner_keywords) or calories > 600:
+    elif any(keyword in name_lower for keyword in DINNER_KEYWORDS) or calories > 600:
         return "Makan Malam"
-    elif any(keyword in name_lower for keyword in lunch_keywords) or (300 <= calories <= 600 and carbs > 20):
+    elif any(keyword in name_lower for keyword in LUNCH_KEYWORDS) or (300 <= calories <= 600 and carbs > 20):
         return "Makan Siang"
     else:
         # Default untuk makanan dengan kalori 300-600
@@ -163,83 +431,38 @@ def estimate_meal_type(name: str, calories: float, carbs: float) -> str:
 def extract_ingredients(name: str) -> List[str]:
     name_lower = name.lower()
     
-    ingredient_dict = {
-        # Buah-buahan
-        'apel': ['apel'], 'pisang': ['pisang'], 'jeruk': ['jeruk'],
-        'mangga': ['mangga'], 'anggur': ['anggur'], 'pepaya': ['pepaya'],
-        'semangka': ['semangka'], 'melon': ['melon'], 'nanas': ['nanas'],
-        'stroberi': ['stroberi'], 'buah': ['buah'], 'alpukat': ['alpukat'],
-        
-        # Protein
-        'ayam': ['ayam', 'bumbu'], 'sapi': ['daging sapi', 'bumbu'], 'babi': ['babi', 'bumbu'],
-        'ikan': ['ikan', 'bumbu'], 'udang': ['udang', 'bumbu'], 'telur': ['telur', 'bumbu'],
-        'bebek': ['bebek', 'bumbu'], 'kambing': ['kambing', 'bumbu'], 'burung': ['burung', 'bumbu'],
-        'domba': ['domba', 'bumbu'], 'angsa': ['angsa', 'bumbu'], 'belibing': ['belibing', 'bumbu'],
-        'kerang': ['kerang', 'bumbu'], 'cumi': ['cumi', 'bumbu'], 'kepiting': ['kepiting', 'bumbu'],
-        
-        
-        # Sayuran
-        'sayur': ['sayuran'], 'kangkung': ['kangkung'],
-        'bayam': ['bayam'], 'wortel': ['wortel'], 'brokoli': ['brokoli'],
-        
-        # Karbohidrat
-        'nasi': ['beras'], 'mie': ['tepung terigu'],
-        'roti': ['tepung terigu'], 'kentang': ['kentang'], 'jagung': ['jagung']
-    }
-    
     ingredients = []
     
     # Mencocokkan bahan dari nama makanan
-    for keyword, items in ingredient_dict.items():
+    for keyword, items in INGREDIENT_KEYWORDS.items():
         if keyword in name_lower:
             ingredients.extend(items)
     
     # Menghapus duplikat dan mengembalikan
-    return list(set(ingredients)) or ['bahan utama', 'bumbu']
+    return list(dict.fromkeys(ingredients)) or list(DEFAULT_INGREDIENTS)
 
 # Function to generate tags based on name and nutrition information
 def generate_tags(name: str, calories: float, protein: float, fat: float, carbs: float) -> List[str]:
     name_lower = name.lower()
     tags = []
 
-    snack_keywords = ['kue', 'biskuit', 'keripik', 'kerupuk', 'camilan']
-    if any(keyword in name_lower for keyword in snack_keywords):
+    if any(keyword in name_lower for keyword in SNACK_KEYWORDS):
         tags.append('camilan')
     
     # Method of cooking
-    cooking_methods = {
-        'goreng': 'goreng', 
-        'bakar': 'bakar', 
-        'rebus': 'rebus', 
-        'kukus': 'kukus',
-        'panggang': 'panggang', 
-        'tumis': 'tumis',
-        'kuah': 'berkuah'
-    }
-    
-    for method, tag in cooking_methods.items():
+    for method, tag in COOKING_METHODS.items():
         if method in name_lower:
             tags.append(tag)
     
     # Flavor profile
-    if 'pedas' in name_lower or 'rica' in name_lower or 'balado' in name_lower:
-        tags.append('pedas')
-    if 'manis' in name_lower:
-        tags.append('manis')
-    if 'asin' in name_lower:
-        tags.append('asin')
-    if 'asam' in name_lower:
-        tags.append('asam')
+    for tag, keywords in FLAVOR_KEYWORDS:
+        if any(keyword in name_lower for keyword in keywords):
+            tags.append(tag)
     
     # Categories based on main ingredients
-    if any(ingredient in name_lower for ingredient in ['ayam', 'sapi', 'kambing', 'daging']):
-        tags.append('daging')
-    if any(ingredient in name_lower for ingredient in ['ikan', 'udang', 'cumi', 'kerang', 'kepiting', 'seafood']):
-        tags.append('seafood')
-    if any(ingredient in name_lower for ingredient in ['tahu', 'tempe', 'kacang', 'kedelai']):
-        tags.append('nabati')
-    if any(ingredient in name_lower for ingredient in ['sayur', 'kangkung', 'bayam', 'wortel', 'brokoli']):
-        tags.append('sayuran')
+    for tag, keywords in CATEGORY_KEYWORDS:
+        if any(ingredient in name_lower for ingredient in keywords):
+            tags.append(tag)
     
     # Nutrition-based tags
     if protein >= 15:
@@ -258,26 +481,14 @@ def generate_tags(name: str, calories: float, protein: float, fat: float, carbs:
         tags.append('tinggi kalori')
     
     # Add cultural indicators if possible
-    cultural_indicators = {
-        'padang': 'padang',
-        'jawa': 'jawa',
-        'sunda': 'sunda',
-        'bali': 'bali',
-        'aceh': 'aceh',
-        'manado': 'manado',
-        'minang': 'minang'
-    }
-    
-    for indicator, tag in cultural_indicators.items():
+    for indicator, tag in CULTURAL_INDICATORS.items():
         if indicator in name_lower:
             tags.append(tag)
             tags.append('tradisional')
             break
     
     # Add 'tradisional' tag for common Indonesian dishes
-    traditional_dishes = ['nasi goreng', 'soto', 'rendang', 'sate', 'gado-gado', 'pecel', 'rawon', 
-                         'bakso', 'mie goreng', 'gudeg', 'opor', 'ketoprak', 'pempek']
-    if any(dish in name_lower for dish in traditional_dishes):
+    if any(dish in name_lower for dish in TRADITIONAL_DISHES):
         if 'tradisional' not in tags:
             tags.append('tradisional')
     
@@ -287,14 +498,10 @@ def generate_tags(name: str, calories: float, protein: float, fat: float, carbs:
 def estimate_fiber(name: str, carbs: float) -> float:
     name_lower = name.lower()
     
-    # High fiber foods
-    high_fiber_indicators = ['sayur', 'kacang', 'biji', 'buah', 'sereal', 'oat', 'brokoli', 
-                            'kangkung', 'bayam', 'wortel', 'apel', 'pisang', 'pepaya']
-    
     base_fiber = carbs * 0.05  # Base estimate: 5% of carbs
     
     # Adjust based on food name indicators
-    if any(indicator in name_lower for indicator in high_fiber_indicators):
+    if any(indicator in name_lower for indicator in HIGH_FIBER_INDICATORS):
         fiber = base_fiber * 2  # Double for high fiber foods
     else:
         fiber = base_fiber
@@ -304,6 +511,40 @@ def estimate_fiber(name: str, carbs: float) -> float:
     
     return round(fiber, 1)
 
+RAW_REQUIRED_COLUMNS = ['id', 'calories', 'proteins', 'fat', 'carbohydrate', 'name']
+CBF_COLUMNS = ['id', 'name', 'type', 'calories', 'protein', 'fat', 'carbs', 'fiber', 'ingredients', 'tags']
+# Ingredients & tags disimpan sebagai kolom list native, bukan string JSON
+CBF_SCHEMA = pa.schema(
+    [('id', pa.int64()), ('name', pa.string()), ('type', pa.string())]
+    + [(col, pa.float64()) for col in ['calories', 'protein', 'fat', 'carbs', 'fiber']]
+    + [('ingredients', pa.list_(pa.string())), ('tags', pa.list_(pa.string()))]
+)
+
+def _normalize_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """Ambil kolom raw yang dibutuhkan, NaN nutrisi -> 0.0 dan nama kosong -> 'Unknown Food'"""
+    numeric = df[['calories', 'proteins', 'fat', 'carbohydrate']].astype(float).fillna(0.0)
+    return pd.DataFrame({
+        'id': df['id'].astype(int).to_numpy(),
+        'name': df['name'].where(df['name'].notna(), "Unknown Food").astype(str).to_numpy(),
+        'calories': numeric['calories'].to_numpy(),
+        'protein': numeric['proteins'].to_numpy(),
+        'fat': numeric['fat'].to_numpy(),
+        'carbs': numeric['carbohydrate'].to_numpy(),
+    })
+
+def _cbf_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Tambahkan kolom hasil enrichment ke data raw ternormalisasi, urut CBF_COLUMNS"""
+    df = df.reset_index(drop=True)
+    enriched = enrich_columns(df['name'], df['calories'], df['protein'], df['fat'], df['carbs'])
+    return pd.concat([df, enriched], axis=1)[CBF_COLUMNS]
+
+def to_cbf_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame CBF (ingredients & tags berupa list) -> Arrow table CBF_SCHEMA"""
+    return pa.Table.from_pandas(df[CBF_COLUMNS], schema=CBF_SCHEMA, preserve_index=False)
+
+def _is_parquet(path) -> bool:
+    return str(path).endswith('.parquet')
+
 # Main processing function
 def process_nutrition_data(csv_path: str, output_path: str = None):
     try:
@@ -311,45 +552,14 @@ def process_nutrition_data(csv_path: str, output_path: str = None):
         df = pd.read_csv(csv_path)
         
         # Check if required columns exist
-        required_columns = ['id', 'calories', 'proteins', 'fat', 'carbohydrate', 'name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in RAW_REQUIRED_COLUMNS if col not in df.columns]
         
         if missing_columns:
             print(f"Error: Missing required columns: {missing_columns}")
             return
         
-        # Process each row
-        processed_data = []
-        
-        for _, row in df.iterrows():
-            # Handle potential NaN values
-            calories = float(row['calories']) if not pd.isna(row['calories']) else 0.0
-            proteins = float(row['proteins']) if not pd.isna(row['proteins']) else 0.0
-            fat = float(row['fat']) if not pd.isna(row['fat']) else 0.0
-            carbs = float(row['carbohydrate']) if not pd.isna(row['carbohydrate']) else 0.0
-            name = str(row['name']) if not pd.isna(row['name']) else "Unknown Food"
-            
-            # Generate enriched data
-            meal_type = estimate_meal_type(name, calories, carbs)
-            ingredients = extract_ingredients(name)
-            tags = generate_tags(name, calories, proteins, fat, carbs)
-            fiber = estimate_fiber(name, carbs)
-            
-            # Create structured entry
-            entry = {
-                "id": int(row['id']),
-                "name": name,
-                "type": meal_type,
-                "calories": calories,
-                "protein": proteins,
-                "fat": fat,
-                "carbs": carbs,
-                "fiber": fiber,
-                "ingredients": ingredients,
-                "tags": tags
-            }
-            
-            processed_data.append(entry)
+        # Handle potential NaN values, lalu generate enriched data (vektor per kolom)
+        processed_data = _cbf_frame(_normalize_raw(df)).to_dict('records')
         
         # Save to JSON file if output path is provided
         if output_path:
@@ -364,33 +574,131 @@ def process_nutrition_data(csv_path: str, output_path: str = None):
         print(f"Error processing data: {str(e)}")
         return None
 
-def convertion():
-    """Buat file khusus untuk CBF dari data processed"""
+# Tahap streaming: setiap tahap adalah generator chunk DataFrame sehingga
+# hanya satu chunk yang berada di memori pada satu waktu
+def clean_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Validasi kolom & normalisasi nilai kosong per chunk raw"""
+    for chunk in chunks:
+        missing_columns = [col for col in RAW_REQUIRED_COLUMNS if col not in chunk.columns]
+        if missing_columns:
+            raise ValueError(f"Kolom raw tidak lengkap: {missing_columns}")
+        yield _normalize_raw(chunk)
+
+def enrich_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Tambahkan type, ingredients, tags & fiber per chunk"""
+    for chunk in chunks:
+        yield _cbf_frame(chunk)
+
+def convert_chunks(chunks: Iterable[pd.DataFrame], output_format: str = 'parquet') -> Iterator:
+    """
+    Siapkan chunk untuk ditulis: Arrow table dengan kolom list (parquet) atau
+    DataFrame dengan list sebagai string JSON seperti CSV lama (csv)
+    """
+    for chunk in chunks:
+        if output_format == 'parquet':
+            yield to_cbf_table(chunk)
+            continue
+        chunk = chunk.copy()
+        chunk['ingredients'] = [json.dumps(x, ensure_ascii=False) for x in chunk['ingredients']]
+        chunk['tags'] = [json.dumps(x, ensure_ascii=False) for x in chunk['tags']]
+        yield chunk
+
+def write_cbf_chunks(chunks: Iterable, cbf_path: str = CBF_PATH) -> int:
+    """
+    Tulis chunk hasil convert_chunks secara bertahap ke file CBF (format
+    mengikuti ekstensi cbf_path: .parquet atau .csv)
+
+    File ditulis ke path sementara lalu di-rename, sehingga pembaca tidak
+    pernah melihat file setengah jadi.
+
+    Returns:
+        int: Jumlah baris yang ditulis
+    """
+    try:
+        tmp_path = Path(f"{cbf_path}.tmp")
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        rows = 0
+        if _is_parquet(cbf_path):
+            with pq.ParquetWriter(tmp_path, CBF_SCHEMA) as writer:
+                for table in chunks:
+                    writer.write_table(table)
+                    rows += table.num_rows
+                    logger.info(f"{rows} baris ditulis ke {cbf_path}")
+        else:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                for chunk in chunks:
+                    chunk.to_csv(
+                        f,
+                        index=False,
+                        header=rows == 0,
+                        quoting=csv.QUOTE_ALL,
+                        escapechar='\\'
+                    )
+                    rows += len(chunk)
+                    logger.info(f"{rows} baris ditulis ke {cbf_path}")
+                if rows == 0:
+                    pd.DataFrame(columns=CBF_COLUMNS).to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+        os.replace(tmp_path, cbf_path)
+        logger.info(f"File CBF-ready dibuat: {cbf_path}")
+        return rows
+    except Exception as e:
+        logger.error(f"Gagal menulis data CBF: {str(e)}")
+        raise
+
+def convertion(cbf_path: str = CBF_PATH):
+    """
+    Buat file khusus untuk CBF dari data processed
+
+    Default berupa Parquet dengan kolom list native sehingga training tidak
+    perlu mem-parse string per sel; path .csv menghasilkan format CSV lama
+    (list sebagai string JSON).
+    """
     try:
         # Baca data processed sebagai JSON
-        with open('data/processed/nutrition/nutrition_processed.json', 'r', encoding='utf-8') as f:
+        with open(PROCESSED_JSON_PATH, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
         # Konversi ke DataFrame
         df = pd.DataFrame(data)
         
-        # Konversi list ke string JSON yang valid
-        df['ingredients'] = df['ingredients'].apply(lambda x: json.dumps(x, ensure_ascii=False))
-        df['tags'] = df['tags'].apply(lambda x: json.dumps(x, ensure_ascii=False))
-        
-        # Simpan dengan format CSV yang benar
-        cbf_path = "data/processed/nutrition/nutrition_convertion.csv"
-        df.to_csv(
-            cbf_path,
-            index=False,
-            quoting=csv.QUOTE_ALL,
-            escapechar='\\',
-            encoding='utf-8'
-        )
+        if _is_parquet(cbf_path):
+            pq.write_table(to_cbf_table(df), cbf_path)
+        else:
+            # Konversi list ke string JSON yang valid
+            df['ingredients'] = df['ingredients'].apply(lambda x: json.dumps(x, ensure_ascii=False))
+            df['tags'] = df['tags'].apply(lambda x: json.dumps(x, ensure_ascii=False))
+            
+            # Simpan dengan format CSV yang benar
+            df.to_csv(
+                cbf_path,
+                index=False,
+                quoting=csv.QUOTE_ALL,
+                escapechar='\\',
+                encoding='utf-8'
+            )
         
         logger.info(f"File CBF-ready dibuat: {cbf_path}")
         return cbf_path
         
     except Exception as e:
         logger.error(f"Gagal membuat data CBF: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+# Kode & konstanta yang menentukan output setiap tahap, dipakai sebagai
+# fingerprint cache tahap di data_pipeline (lihat stage_cache.code_fingerprint)
+ENRICHMENT_RULES = (
+    BREAKFAST_KEYWORDS, LUNCH_KEYWORDS, DINNER_KEYWORDS, INGREDIENT_KEYWORDS, DEFAULT_INGREDIENTS,
+    SNACK_KEYWORDS, COOKING_METHODS, FLAVOR_KEYWORDS, CATEGORY_KEYWORDS, CULTURAL_INDICATORS,
+    TRADITIONAL_DISHES, HIGH_FIBER_INDICATORS, KeywordMatcher, _lists_per_pattern, enrich_columns
+)
+STAGE_CODE = {
+    'cleaning': (CLEAN_MODES, clean_data, clean_data_with_stats, handle_missing_values,
+                 handle_missing_values_vectorized, convert_data_types, handle_outliers,
+                 handle_outliers_with_counts, handle_outliers_vectorized, save_clean_data),
+    'enrichment': ENRICHMENT_RULES + (RAW_REQUIRED_COLUMNS, CBF_COLUMNS, _normalize_raw, _cbf_frame,
+                                      process_nutrition_data),
+    'conversion': (CBF_COLUMNS, CBF_SCHEMA, to_cbf_table, _is_parquet, convertion),
+    'streaming': ENRICHMENT_RULES + (RAW_REQUIRED_COLUMNS, CBF_COLUMNS, CBF_SCHEMA, _normalize_raw, _cbf_frame,
+                                     to_cbf_table, _is_parquet, clean_chunks, enrich_chunks, convert_chunks,
+                                     write_cbf_chunks),
+}
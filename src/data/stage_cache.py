@@ -0,0 +1,151 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGE_CACHE_DIR = Path("data/processed/stages")
+
+
+def file_hash(path, block_size: int = 1 << 20) -> str:
+    """SHA-256 isi file, dibaca per blok agar file besar tidak dimuat sekaligus"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_fingerprint(*objects) -> str:
+    """
+    Hash source fungsi/kelas dan repr konstanta yang dipakai sebuah tahap,
+    sehingga perubahan aturan (mis. keyword tag) hanya menginvalidasi tahap
+    yang memakainya
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        if inspect.isfunction(obj) or inspect.isclass(obj):
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        else:
+            digest.update(repr(obj).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StageCache:
+    def __init__(self, cache_dir: Path = STAGE_CACHE_DIR, force: bool = False, metrics=None):
+        """
+        Cache berbasis konten untuk tahap-tahap pipeline data
+
+        Setiap tahap menyimpan record JSON di cache_dir berisi hash input
+        (isi file), parameter dan kode tahap, serta hash file outputnya.
+        Tahap dilewati bila hash tersebut sama dan output masih utuh.
+
+        Args:
+            cache_dir: Folder record tahap
+            force: Jalankan semua tahap tanpa melihat cache (record tetap ditulis)
+            metrics: Registry opsional (mis. src.utils.metrics.METRICS) yang
+                menerima durasi tahap sebagai timer 'pipeline.<tahap>'
+        """
+        self.cache_dir = Path(cache_dir)
+        self.force = force
+        self.metrics = metrics
+        self.timings: List[Dict[str, Any]] = []
+
+    def run(self, name: str, func: Callable[[], Any], inputs: Iterable[str], outputs: Iterable[str],
+            params: Optional[Dict] = None, code: str = '') -> bool:
+        """
+        Jalankan satu tahap kecuali hasilnya sudah ada di cache
+
+        Args:
+            name: Nama tahap (nama file record)
+            func: Fungsi tanpa argumen yang menjalankan tahap
+            inputs: File yang dibaca tahap
+            outputs: File yang ditulis tahap
+            params: Parameter tahap (harus bisa di-serialize ke JSON)
+            code: Fingerprint kode tahap (lihat code_fingerprint)
+
+        Returns:
+            bool: True bila tahap dilewati (cache hit)
+        """
+        start = time.perf_counter()
+        outputs = [str(p) for p in outputs]
+        key, input_hashes = self._key(name, inputs, params, code)
+
+        if not self.force and self._valid(self._read(name), key, outputs):
+            return self._log(name, True, time.perf_counter() - start)
+
+        func()
+        duration = time.perf_counter() - start
+        self._write(name, {
+            'stage': name,
+            'key': key,
+            'inputs': input_hashes,
+            'params': params or {},
+            'outputs': {path: file_hash(path) for path in outputs},
+            'duration': duration,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        return self._log(name, False, duration)
+
+    def cached(self, name: str, inputs: Iterable[str], outputs: Iterable[str],
+               params: Optional[Dict] = None, code: str = '') -> bool:
+        """
+        Cek (dan log) cache hit tanpa menjalankan tahap, untuk tahap yang
+        dijalankan di tempat lain (mis. proses background yang memanggil run)
+        """
+        start = time.perf_counter()
+        key, _ = self._key(name, inputs, params, code)
+        if not self.force and self._valid(self._read(name), key, [str(p) for p in outputs]):
+            return self._log(name, True, time.perf_counter() - start)
+        return False
+
+    def summary(self):
+        """Log ringkasan hit/miss & waktu per tahap untuk run ini"""
+        for timing in self.timings:
+            logger.info(f"  {timing['stage']:<12} {'HIT ' if timing['hit'] else 'MISS'} {timing['seconds']:8.2f}s")
+        total = sum(timing['seconds'] for timing in self.timings)
+        hits = sum(timing['hit'] for timing in self.timings)
+        logger.info(f"  {hits}/{len(self.timings)} tahap dari cache, total {total:.2f}s")
+
+    def _key(self, name: str, inputs: Iterable[str], params: Optional[Dict], code: str):
+        input_hashes = {str(path): file_hash(path) for path in inputs}
+        key = hashlib.sha256(json.dumps(
+            {'stage': name, 'inputs': input_hashes, 'params': params or {}, 'code': code},
+            sort_keys=True
+        ).encode('utf-8')).hexdigest()
+        return key, input_hashes
+
+    def _valid(self, record: Optional[Dict], key: str, outputs: List[str]) -> bool:
+        if record is None or record.get('key') != key or set(record.get('outputs', {})) != set(outputs):
+            return False
+        # Output harus masih ada & tidak berubah sejak tahap terakhir dijalankan
+        return all(os.path.exists(path) and file_hash(path) == digest
+                   for path, digest in record['outputs'].items())
+
+    def _read(self, name: str) -> Optional[Dict]:
+        try:
+            with open(self.cache_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, name: str, record: Dict):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_dir / f"{name}.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, self.cache_dir / f"{name}.json")
+
+    def _log(self, name: str, hit: bool, seconds: float) -> bool:
+        self.timings.append({'stage': name, 'hit': hit, 'seconds': seconds})
+        if self.metrics is not None:
+            self.metrics.observe(f'pipeline.{name}', seconds)
+            self.metrics.incr(f"pipeline.cache_{'hits' if hit else 'misses'}")
+        logger.info(f"[{name}] cache {'hit, dilewati' if hit else 'miss, dijalankan'} ({seconds:.2f}s)")
+        return hit
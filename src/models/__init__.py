@@ -0,0 +1,20 @@
+# Import tertunda (PEP 562): pandas/scikit-learn/joblib baru dimuat saat
+# CBFTrainer atau CBFRecommender pertama kali dipakai
+_LAZY = {
+    'CBFTrainer': '.cbf.model',
+    'CBFRecommender': '.cbf.recommender',
+    'BundleSearcher': '.cbf.lite',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+
+class IVFIndex:
+    """Approximate nearest neighbour berbasis coarse quantizer (IVF).
+
+    Baris ternormalisasi dikelompokkan dengan spherical k-means ke n_lists
+    centroid dan disimpan ulang per list (list-major) sehingga tiap list
+    adalah blok baris kontigu. Saat query hanya baris di n_probe list dengan
+    centroid paling mirip yang diberi skor, n_probe menjadi knob recall vs
+    latency.
+    """
+
+    def __init__(self, n_lists=None, n_iter=10, sample_per_list=64, chunk_size=65536, seed=42):
+        self.n_lists = n_lists
+        self.n_iter = n_iter
+        self.sample_per_list = sample_per_list
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+    def fit(self, matrix):
+        """Latih centroid dari sampel baris, lalu assign seluruh katalog ke list"""
+        n_rows = matrix.shape[0]
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n_rows))), n_rows)
+        rng = np.random.default_rng(self.seed)
+
+        sample_size = min(n_rows, n_lists * self.sample_per_list)
+        sample = matrix[rng.choice(n_rows, size=sample_size, replace=False)]
+        centroids = _dense(sample[rng.choice(sample_size, size=n_lists, replace=False)])
+
+        for _ in range(self.n_iter):
+            labels = self._assign(sample, centroids)
+            membership = sparse.csr_matrix(
+                (np.ones(sample_size), (labels, np.arange(sample_size))),
+                shape=(n_lists, sample_size)
+            )
+            sums = _dense(membership @ sample)
+            # List kosong mempertahankan centroid lama
+            empty = np.asarray(membership.sum(axis=1)).ravel() == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+
+        self.centroids = centroids
+        return self.assign(matrix)
+
+    def assign(self, matrix):
+        """Bangun ulang list untuk seluruh baris memakai centroid yang sudah ada"""
+        labels = self._assign(matrix, self.centroids)
+        return self._set_lists(np.arange(matrix.shape[0]), labels, sparse.csr_matrix(matrix))
+
+    def update(self, positions, matrix):
+        """Masukkan baris baru / ganti baris di posisi tertentu tanpa k-means ulang.
+
+        Hanya baris tsb yang di-assign ke centroid, baris lain tetap di list
+        lamanya (dipakai update katalog inkremental).
+
+        Args:
+            positions: Posisi global baris baru / berubah
+            matrix: Baris ternormalisasi untuk positions (urutan sama)
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        labels = np.repeat(np.arange(len(self.centroids)), np.diff(self.offsets))
+        keep = np.flatnonzero(~np.isin(self.list_positions, positions))
+        rows = np.concatenate((keep, len(self.list_positions) + np.arange(len(positions))))
+        return self._set_lists(
+            np.concatenate((self.list_positions, positions))[rows],
+            np.concatenate((labels, self._assign(matrix, self.centroids)))[rows],
+            sparse.vstack((self.list_matrix, matrix)).tocsr(),
+            rows
+        )
+
+    def _set_lists(self, positions, labels, matrix, rows=None):
+        """Susun baris list-major; rows = baris matrix untuk positions (default semua)"""
+        order = np.argsort(labels, kind='stable')
+        self.list_positions = positions[order]
+        self.list_matrix = matrix[order if rows is None else rows[order]]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=len(self.centroids)))))
+        return self
+
+    def _assign(self, matrix, centroids):
+        """Centroid terdekat per baris, diproses per blok agar memori terbatas"""
+        labels = np.empty(matrix.shape[0], dtype=np.intp)
+        for start in range(0, matrix.shape[0], self.chunk_size):
+            block = matrix[start:start + self.chunk_size]
+            labels[start:start + self.chunk_size] = np.asarray(block @ centroids.T).argmax(axis=1)
+        return labels
+
+    def search(self, query, n_probe):
+        """Skor baris di n_probe list terdekat.
+
+        Returns:
+            Tuple (posisi baris global urut naik, skor cosine masing-masing)
+        """
+        n_probe = min(n_probe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        positions = np.concatenate([self.list_positions[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        scores = np.concatenate([self._block(i) @ query for i in lists])
+        order = np.argsort(positions)
+        return positions[order], scores[order]
+
+    def _block(self, i):
+        """View CSR untuk list ke-i tanpa menyalin data"""
+        matrix = self.list_matrix
+        start, end = matrix.indptr[self.offsets[i]], matrix.indptr[self.offsets[i + 1]]
+        return sparse.csr_matrix(
+            (matrix.data[start:end], matrix.indices[start:end],
+             matrix.indptr[self.offsets[i]:self.offsets[i + 1] + 1] - start),
+            shape=(self.offsets[i + 1] - self.offsets[i], matrix.shape[1]),
+            copy=False
+        )
+
+
+def _dense(matrix):
+    return matrix.toarray() if sparse.issparse(matrix) else np.asarray(matrix)
@@ -0,0 +1,271 @@
+"""Bundle artefak model tunggal yang bisa di-memory-map.
+
+Layout (di bawah <model_dir>/bundles/<version>/):
+    manifest.json                 metadata, versi & daftar array
+    meal_ids.npy
+    feature_matrix.{data,indices,indptr}.npy
+    normalized.{data,indices,indptr}.npy  (+ normalized.scale.npy untuk int8)
+    partitions/type/<k>.positions.npy + <k>.{data,indices,indptr}.npy
+    neighbors/all.{positions,scores}.npy + neighbors/type/<k>.*  (bila neighbor_k > 0)
+    meal_data.arrow               metadata meal (Arrow IPC, tanpa kompresi)
+    vectorizer.pkl, scaler.pkl    (ann_index.pkl bila ada)
+
+Versi selalu unik (timestamp, hash isi & opsi, suffix acak). Bundle ditulis
+ke folder sementara lalu dipindah utuh, sehingga file yang sedang di-mmap
+reader tidak pernah ditimpa. <model_dir>/bundles/LATEST berisi versi aktif
+dan ditulis atomik setelah seluruh isi bundle selesai ditulis. File yang
+isinya tidak berubah (partisi, vectorizer, scaler) di-hard-link dari bundle
+asal, bundle lama dihapus dengan prune_bundles.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+from .neighbors import write_neighbor_tables
+
+# joblib, scipy & pyarrow diimpor di dalam fungsi agar latest_bundle /
+# read_manifest bisa dipakai path query NumPy-only (lihat lite.py)
+
+FORMAT_VERSION = 1
+BUNDLES_DIR = 'bundles'
+LATEST_FILE = 'LATEST'
+# dtype baris ternormalisasi; float16 tidak didukung operasi sparse scipy
+FEATURE_DTYPES = ('float64', 'float32', 'int8')
+
+
+def save_csr(directory, name, matrix):
+    """Simpan komponen CSR sebagai .npy terpisah"""
+    from scipy import sparse
+    matrix = sparse.csr_matrix(matrix)
+    for part in ('data', 'indices', 'indptr'):
+        np.save(os.path.join(directory, f'{name}.{part}.npy'), getattr(matrix, part))
+
+
+def load_csr(directory, name, shape):
+    """Buka CSR secara memory-map read-only tanpa menyalin array"""
+    from scipy import sparse
+    data, indices, indptr = (
+        np.load(os.path.join(directory, f'{name}.{part}.npy'), mmap_mode='r')
+        for part in ('data', 'indices', 'indptr')
+    )
+    return sparse.csr_matrix((data, indices, indptr), shape=tuple(shape), copy=False)
+
+
+def row_scales(matrix):
+    """Skala int8 per baris: max |x| baris / 127 (1.0 untuk baris kosong)"""
+    lengths = np.diff(matrix.indptr)
+    nonempty = lengths > 0
+    maxima = np.zeros(matrix.shape[0])
+    if matrix.nnz:
+        maxima[nonempty] = np.maximum.reduceat(np.abs(matrix.data), matrix.indptr[:-1][nonempty])
+    return np.where(maxima > 0, maxima / 127, 1.0).astype(np.float32)
+
+
+def quantize(matrix, dtype, scales=None):
+    """Salin CSR dengan data bertipe dtype; int8 disimpan sebagai round(x / skala baris)"""
+    from scipy import sparse
+    matrix = sparse.csr_matrix(matrix)
+    data = matrix.data
+    if dtype == 'int8':
+        data = np.rint(data / np.repeat(scales, np.diff(matrix.indptr)))
+    return sparse.csr_matrix((data.astype(dtype), matrix.indices, matrix.indptr), shape=matrix.shape)
+
+
+def load_row_scales(bundle_dir, manifest):
+    """Skala per baris matriks ternormalisasi int8 (None untuk bundle float)"""
+    if manifest.get('feature_dtype') != 'int8':
+        return None
+    return np.load(os.path.join(bundle_dir, 'normalized.scale.npy'), mmap_mode='r')
+
+
+def dequantize(matrix, scales):
+    """Baris ternormalisasi sebagai float64 (mis. untuk digabung dengan baris baru)"""
+    from scipy import sparse
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    if scales is None:
+        return matrix
+    return (sparse.diags(np.asarray(scales, dtype=np.float64)) @ matrix).tocsr()
+
+
+def link_file(source, target):
+    """Hard link file bundle lain (isinya tidak pernah diubah), salin bila tidak didukung filesystem"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def write_bundle(model_dir, feature_matrix, normalized_matrix, meal_data, partitions,
+                 vectorizer, scaler, ann_index=None, extra=None, feature_dtype='float32',
+                 neighbor_k=0, neighbor_budget=256 * 2**20, quantized=False, row_scale=None, keep=None):
+    """Tulis bundle versi baru lalu jadikan LATEST.
+
+    Args:
+        partitions: Dict {kolom: {nilai: Partition}} dari build_partitions;
+            partisi dengan source di-hard-link dari file tsb
+        vectorizer, scaler: Objek fitted, atau path .pkl yang sudah ada
+            (di-hard-link, mis. dari bundle asal update inkremental)
+        feature_dtype: dtype matriks ternormalisasi & partisi di disk
+            (lihat FEATURE_DTYPES); int8 disertai skala per baris
+            (normalized.scale.npy) yang dikalikan kembali saat scoring
+        neighbor_k: Jumlah tetangga per meal pada tabel tetangga (0 = tanpa tabel)
+        neighbor_budget: Batas byte matriks skor per blok saat membangun tabel
+        extra: Field tambahan untuk manifest (mis. statistik drift)
+        quantized: normalized_matrix & partisi sudah dalam feature_dtype
+            (mis. baris bundle lama + baris baru), row_scale = skala int8
+            per baris-nya; selain itu dikuantisasi dari matriks float
+        keep: Jumlah bundle terbaru yang disimpan (None = tanpa prune)
+
+    Returns:
+        str: Versi bundle yang ditulis
+    """
+    import joblib
+    import pyarrow.feather as feather
+
+    if feature_dtype not in FEATURE_DTYPES:
+        raise ValueError(f"feature_dtype harus salah satu dari {FEATURE_DTYPES}")
+    if feature_dtype != 'int8':
+        scales = None
+    elif quantized:
+        scales = np.asarray(row_scale, dtype=np.float32)
+    else:
+        scales = row_scales(normalized_matrix)
+
+    digest = hashlib.sha1(np.ascontiguousarray(normalized_matrix.data).tobytes())
+    digest.update(meal_data['id'].to_numpy().tobytes())
+    digest.update(f"{feature_dtype}|{ann_index is not None}|{neighbor_k}".encode())
+    # Suffix acak: dua training di detik yang sama tetap mendapat versi berbeda
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{digest.hexdigest()[:8]}-{uuid.uuid4().hex[:8]}"
+
+    root = os.path.join(model_dir, BUNDLES_DIR)
+    bundle_dir = os.path.join(root, version)
+    if os.path.exists(bundle_dir):
+        # Reader yang sedang memory-map bundle tsb tidak boleh melihat file terpotong
+        raise FileExistsError(f"Bundle {version} sudah ada")
+
+    # Tulis ke folder sementara lalu pindahkan utuh, folder versi tidak pernah setengah jadi
+    staging_dir = os.path.join(root, f'.{version}.tmp')
+    os.makedirs(staging_dir)
+    try:
+        np.save(os.path.join(staging_dir, 'meal_ids.npy'), meal_data['id'].to_numpy())
+        save_csr(staging_dir, 'feature_matrix', feature_matrix)
+        stored = normalized_matrix if quantized else quantize(normalized_matrix, feature_dtype, scales)
+        save_csr(staging_dir, 'normalized', stored)
+        if scales is not None:
+            np.save(os.path.join(staging_dir, 'normalized.scale.npy'), scales)
+
+        partition_values = {}
+        for column, parts in partitions.items():
+            part_dir = os.path.join(staging_dir, 'partitions', column)
+            os.makedirs(part_dir, exist_ok=True)
+            partition_values[column] = []
+            for k, (value, partition) in enumerate(parts.items()):
+                partition_values[column].append(value)
+                if partition.source is not None:
+                    source_dir, name = partition.source
+                    for part in ('positions', 'data', 'indices', 'indptr'):
+                        link_file(os.path.join(source_dir, f'{name}.{part}.npy'),
+                                  os.path.join(part_dir, f'{k}.{part}.npy'))
+                    continue
+                np.save(os.path.join(part_dir, f'{k}.positions.npy'), partition.positions)
+                part_scales = scales[partition.positions] if scales is not None else None
+                save_csr(part_dir, str(k), partition.matrix if quantized
+                         else quantize(partition.matrix, feature_dtype, part_scales))
+
+        if neighbor_k:
+            # Skor tabel dihitung dari baris yang benar-benar disimpan agar sama dengan skor query
+            stored = dequantize(stored, scales)
+            neighbor_dir = os.path.join(staging_dir, 'neighbors')
+            os.makedirs(os.path.join(neighbor_dir, 'type'), exist_ok=True)
+            groups = [partition.positions for partition in partitions.get('type', {}).values()]
+            write_neighbor_tables(neighbor_dir, stored, groups, neighbor_k, neighbor_budget)
+
+        feather.write_feather(meal_data, os.path.join(staging_dir, 'meal_data.arrow'),
+                              compression='uncompressed')
+        for name, artifact in (('vectorizer.pkl', vectorizer), ('scaler.pkl', scaler)):
+            if isinstance(artifact, str):
+                link_file(artifact, os.path.join(staging_dir, name))
+            else:
+                joblib.dump(artifact, os.path.join(staging_dir, name))
+        if ann_index is not None:
+            joblib.dump(ann_index, os.path.join(staging_dir, 'ann_index.pkl'))
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'n_rows': int(normalized_matrix.shape[0]),
+            'n_features': int(normalized_matrix.shape[1]),
+            'partitions': partition_values,
+            'has_ann': ann_index is not None,
+            'feature_dtype': feature_dtype,
+            'neighbor_k': neighbor_k,
+            **(extra or {}),
+        }
+        with open(os.path.join(staging_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(staging_dir, bundle_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    # Tukar pointer LATEST secara atomik
+    tmp_path = os.path.join(root, f'{LATEST_FILE}.{version}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, LATEST_FILE))
+    if keep is not None:
+        prune_bundles(model_dir, keep)
+    return version
+
+
+def prune_bundles(model_dir, keep):
+    """Hapus bundle lama, sisakan keep versi terbaru (bundle LATEST tidak pernah dihapus).
+
+    Reader yang masih me-mmap bundle terhapus tetap aman di POSIX (file baru
+    hilang setelah mapping ditutup); reader tertinggal satu versi masih bisa
+    membuka file lazy (vectorizer/scaler) selama keep >= 2.
+
+    Returns:
+        List: Versi yang dihapus
+    """
+    if keep < 1:
+        raise ValueError("keep minimal 1")
+    root = os.path.join(model_dir, BUNDLES_DIR)
+    latest = os.path.basename(latest_bundle(model_dir) or '')
+    versions = [entry for entry in os.scandir(root)
+                if entry.is_dir() and not entry.name.startswith('.') and entry.name != latest]
+    # Urut waktu folder dipindah ke tempatnya, nama (timestamp) sebagai pemecah seri
+    versions.sort(key=lambda entry: (entry.stat().st_mtime_ns, entry.name), reverse=True)
+    removed = []
+    for entry in versions[keep - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed.append(entry.name)
+    return removed
+
+
+def latest_bundle(model_dir):
+    """Path bundle aktif, None bila model_dir hanya berisi artefak lama"""
+    latest_path = os.path.join(model_dir, BUNDLES_DIR, LATEST_FILE)
+    if not os.path.exists(latest_path):
+        return None
+    with open(latest_path, encoding='utf-8') as f:
+        version = f.read().strip()
+    return os.path.join(model_dir, BUNDLES_DIR, version)
+
+
+def read_manifest(bundle_dir):
+    with open(os.path.join(bundle_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Format bundle {manifest['format_version']} tidak didukung")
+    return manifest
+
+
+def load_meal_table(bundle_dir):
+    """Metadata meal sebagai pyarrow.Table yang di-memory-map"""
+    import pyarrow.feather as feather
+    return feather.read_table(os.path.join(bundle_dir, 'meal_data.arrow'), memory_map=True)
@@ -0,0 +1,133 @@
+import sys
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ('calories', 'protein', 'fat', 'carbs', 'fiber')
+
+
+class Meal:
+    """Satu baris katalog; __slots__ agar tiap record tidak membawa __dict__"""
+
+    __slots__ = ('id', 'name', 'type', 'calories', 'protein', 'fat', 'carbs', 'fiber', 'ingredients', 'tags')
+
+    def __init__(self, id, name, type, calories, protein, fat, carbs, fiber, ingredients, tags):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.calories = calories
+        self.protein = protein
+        self.fat = fat
+        self.carbs = carbs
+        self.fiber = fiber
+        self.ingredients = ingredients
+        self.tags = tags
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"Meal(id={self.id}, name={self.name!r}, type={self.type!r}, calories={self.calories})"
+
+
+class CodedLists:
+    """Kolom list string (ingredients/tags) sebagai kode int per item + offset per baris"""
+
+    def __init__(self, offsets, codes, vocabulary):
+        self.offsets = offsets
+        self.codes = codes
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_arrow(cls, column):
+        """Dari kolom list Arrow: item di-dictionary-encode tanpa membuat list Python per baris"""
+        lists = column.combine_chunks()
+        encoded = lists.flatten().dictionary_encode()
+        offsets = np.asarray(lists.offsets, dtype=np.int64)
+        vocabulary = tuple(sys.intern(value) for value in encoded.dictionary.to_pylist())
+        code_dtype = np.int32 if len(vocabulary) > np.iinfo(np.int16).max else np.int16
+        return cls(offsets - offsets[0], np.asarray(encoded.indices).astype(code_dtype), vocabulary)
+
+    def get(self, i):
+        vocabulary = self.vocabulary
+        return tuple(vocabulary[code] for code in self.codes[self.offsets[i]:self.offsets[i + 1]])
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.codes.nbytes + sum(sys.getsizeof(v) for v in self.vocabulary)
+
+
+class MealCatalog:
+    def __init__(self, ids, names, type_codes, type_values, nutrients, ingredients, tags):
+        """
+        Metadata katalog dalam bentuk kolom ringkas
+
+        Args:
+            ids: Array id meal (int64)
+            names: Array object berisi string nama yang di-intern
+            type_codes: Kode int16 per baris ke type_values (-1 = kosong)
+            type_values: Tuple nilai meal type
+            nutrients: Array float64 N x 5 (urutan NUMERIC_COLUMNS), nilai
+                dipertahankan persis seperti data training
+            ingredients, tags: CodedLists
+        """
+        self.ids = ids
+        self.names = names
+        self.type_codes = type_codes
+        self.type_values = type_values
+        self.nutrients = nutrients
+        self.ingredients = ingredients
+        self.tags = tags
+
+    @classmethod
+    def from_table(cls, table):
+        """Bangun dari pyarrow.Table meal_data bundle (tanpa DataFrame penuh)"""
+        types = table['type'].combine_chunks().dictionary_encode()
+        if len(types.dictionary) > np.iinfo(np.int16).max:
+            raise ValueError(f"Terlalu banyak meal type ({len(types.dictionary)}) untuk kode int16")
+        # Nama yang sama menunjuk ke satu objek string
+        names = table['name'].combine_chunks().dictionary_encode()
+        unique_names = np.array([sys.intern(name) for name in names.dictionary.to_pylist()], dtype=object)
+        return cls(
+            ids=np.asarray(table['id'], dtype=np.int64),
+            names=unique_names[np.asarray(names.indices)],
+            type_codes=np.asarray(types.indices.fill_null(-1), dtype=np.int16),
+            type_values=tuple(sys.intern(value) for value in types.dictionary.to_pylist()),
+            nutrients=np.column_stack([np.asarray(table[c], dtype=np.float64) for c in NUMERIC_COLUMNS]),
+            ingredients=CodedLists.from_arrow(table['ingredients']),
+            tags=CodedLists.from_arrow(table['tags']),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def record(self, i):
+        calories, protein, fat, carbs, fiber = self.nutrients[i].tolist()
+        code = self.type_codes[i]
+        return Meal(
+            int(self.ids[i]), self.names[i], self.type_values[code] if code >= 0 else None,
+            calories, protein, fat, carbs, fiber, self.ingredients.get(i), self.tags.get(i)
+        )
+
+    def records(self, positions):
+        return [self.record(i) for i in positions]
+
+    def frame(self, positions):
+        """DataFrame kecil untuk posisi tertentu, index = posisi baris"""
+        positions = np.asarray(positions, dtype=np.intp)
+        codes = self.type_codes[positions]
+        type_values = np.array(self.type_values + (None,), dtype=object)
+        return pd.DataFrame({
+            'id': self.ids[positions],
+            'name': self.names[positions],
+            'type': type_values[codes],
+            **{column: self.nutrients[positions, k] for k, column in enumerate(NUMERIC_COLUMNS)},
+            'ingredients': [list(self.ingredients.get(i)) for i in positions],
+            'tags': [list(self.tags.get(i)) for i in positions],
+        }, index=positions)
+
+    @property
+    def nbytes(self):
+        """Perkiraan memori: array + string unik (nama di-intern dihitung sekali)"""
+        names = sum(sys.getsizeof(name) for name in set(self.names.tolist()))
+        return (self.ids.nbytes + self.names.nbytes + names + self.type_codes.nbytes
+                + self.nutrients.nbytes + self.ingredients.nbytes + self.tags.nbytes)
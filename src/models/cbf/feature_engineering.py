@@ -1,28 +1,46 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import MinMaxScaler
+from scipy import sparse
 import numpy as np
 
+NUMERIC_FEATURES = ['calories', 'protein', 'fat', 'carbs', 'fiber']
+
 class FeatureEngineer:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english')
-        self.scaler = MinMaxScaler()
-    
-    def prepare_features(self, df):
-        """Tidak perlu konversi tambahan karena data sudah dalam format list"""
-        # Gabungkan text features langsung dari list
+    def __init__(self, vectorizer=None, scaler=None):
+        self.vectorizer = vectorizer if vectorizer is not None else TfidfVectorizer(stop_words='english')
+        self.scaler = scaler if scaler is not None else MinMaxScaler()
+
+    def build_text(self, df):
+        """Gabungkan text features langsung dari list ingredients & tags"""
         df['combined_text'] = df.apply(
             lambda x: ' '.join(x['ingredients']) + ' ' + ' '.join(x['tags']), 
             axis=1
         )
-        
+        return df['combined_text']
+    
+    def prepare_features(self, df):
+        """Tidak perlu konversi tambahan karena data sudah dalam format list.
+
+        Hasilnya berupa matriks CSR (TF-IDF + fitur numerik) supaya ukuran
+        memori mengikuti jumlah nilai non-nol, bukan meals x vocabulary.
+        """
         # TF-IDF
-        tfidf_matrix = self.vectorizer.fit_transform(df['combined_text'])
+        tfidf_matrix = self.vectorizer.fit_transform(self.build_text(df))
         
         # Normalisasi fitur numerik
-        num_features = self.scaler.fit_transform(
-            df[['calories', 'protein', 'fat', 'carbs', 'fiber']]
-        )
+        num_features = self.scaler.fit_transform(df[NUMERIC_FEATURES])
         
-        # Gabungkan fitur
-        feature_matrix = np.hstack((tfidf_matrix.toarray(), num_features))
-        return feature_matrix
\ No newline at end of file
+        return self._combine(tfidf_matrix, num_features)
+
+    def transform(self, df):
+        """Encode meal baru dengan vocabulary & scaler yang sudah di-fit (tanpa refit)"""
+        tfidf_matrix = self.vectorizer.transform(self.build_text(df))
+        num_features = self.scaler.transform(df[NUMERIC_FEATURES])
+        return self._combine(tfidf_matrix, num_features)
+
+    def _combine(self, tfidf_matrix, num_features):
+        # Gabungkan fitur tanpa densify, kolom numerik ditambahkan sebagai kolom sparse
+        return sparse.hstack(
+            (tfidf_matrix, sparse.csr_matrix(num_features, dtype=np.float64)),
+            format='csr'
+        )
@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from . import bundle
+from .feature_engineering import FeatureEngineer, NUMERIC_FEATURES
+from .model import CBFTrainer
+from .partitions import Partition
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogUpdater:
+    def __init__(self, model_dir='models/', drift_threshold=0.1, keep_bundles=3):
+        """
+        Tambah / update meal tanpa full retrain.
+
+        Meal baru di-encode dengan vocabulary TF-IDF & scaler yang dibekukan
+        dari refit terakhir, lalu baris matriks & metadata ditambahkan ke
+        bundle versi baru (bundle lama tidak diubah sehingga reader yang
+        sedang me-mmap tetap aman). Baris lama disalin apa adanya tanpa
+        encode / kuantisasi ulang, partisi type yang tidak berubah serta
+        vectorizer & scaler di-hard-link, dan hanya meal baru / berubah
+        yang di-assign ke list IVF. Drift dicatat di manifest dan full refit
+        dijalankan di background saat melewati drift_threshold.
+
+        Tabel tetangga tidak ikut ditulis pada bundle hasil update (query
+        memakai scoring exact) dan dibangun ulang saat refit.
+
+        Args:
+            model_dir: Folder model yang sudah berisi bundle
+            drift_threshold: Batas skor drift (lihat drift_score) untuk refit
+            keep_bundles: Jumlah bundle terbaru yang disimpan setelah update /
+                refit, bundle lebih lama dihapus (None = simpan semua)
+        """
+        self.model_dir = model_dir
+        self.drift_threshold = drift_threshold
+        self.keep_bundles = keep_bundles
+        self.refit_thread = None
+        self._lock = threading.Lock()
+
+    def update(self, meals, background_refit=True):
+        """
+        Tambahkan meal baru atau ganti meal dengan id yang sudah ada
+
+        Args:
+            meals: DataFrame kolom katalog (id, name, type, nutrisi,
+                ingredients & tags berupa list)
+            background_refit: Jalankan refit di thread background bila drift
+                melewati batas (False = refit langsung sebelum return)
+
+        Returns:
+            str: Versi bundle baru
+        """
+        with self._lock:
+            version, drift = self._append(meals)
+
+        score = drift_score(drift)
+        logger.info(f"Bundle {version} ditulis, skor drift {score:.3f}")
+        if score > self.drift_threshold:
+            if background_refit:
+                self.refit_thread = threading.Thread(target=self.refit, name='catalog-refit')
+                self.refit_thread.start()
+            else:
+                self.refit()
+        return version
+
+    def refit(self):
+        """Full refit vectorizer, scaler & matriks dari katalog bundle terbaru"""
+        with self._lock:
+            bundle_dir = self._latest()
+            manifest = bundle.read_manifest(bundle_dir)
+            catalog = bundle.load_meal_table(bundle_dir).to_pandas()
+            for column in ('ingredients', 'tags'):
+                catalog[column] = catalog[column].map(list)
+
+            logger.info(f"Refit penuh dari bundle {manifest['version']} ({len(catalog)} meals)")
+            trainer = CBFTrainer(model_dir=self.model_dir, build_ann=manifest['has_ann'],
+                                 feature_dtype=manifest.get('feature_dtype', 'float64'),
+                                 neighbor_k=refit_neighbor_k(manifest), keep_bundles=self.keep_bundles)
+            trainer.train(df=catalog)
+            return trainer.version
+
+    def _latest(self):
+        bundle_dir = bundle.latest_bundle(self.model_dir)
+        if bundle_dir is None:
+            raise FileNotFoundError(f"Belum ada bundle di {self.model_dir}, jalankan CBFTrainer.train dulu")
+        return bundle_dir
+
+    def _append(self, meals):
+        bundle_dir = self._latest()
+        manifest = bundle.read_manifest(bundle_dir)
+        table = bundle.load_meal_table(bundle_dir)
+        shape = (manifest['n_rows'], manifest['n_features'])
+        feature_dtype = manifest.get('feature_dtype', 'float64')
+
+        # Cek kolom sebelum encode (combined_text dibuat oleh transform)
+        missing = set(table.column_names) - set(meals.columns) - {'combined_text'}
+        if missing:
+            raise ValueError(f"Kolom meal tidak lengkap: {sorted(missing)}")
+
+        meals = meals.drop_duplicates('id', keep='last').reset_index(drop=True)
+        engineer = FeatureEngineer(
+            vectorizer=joblib.load(os.path.join(bundle_dir, 'vectorizer.pkl')),
+            scaler=joblib.load(os.path.join(bundle_dir, 'scaler.pkl'))
+        )
+        new_features = engineer.transform(meals)
+        new_normalized = normalize(new_features, norm='l2', axis=1)
+        new_scales = bundle.row_scales(new_normalized) if feature_dtype == 'int8' else None
+
+        # Id lama diganti di posisinya, id baru ditambahkan di akhir
+        n_old = shape[0]
+        positions = pd.Index(np.asarray(table['id'])).get_indexer(meals['id'])
+        replaced = positions >= 0
+        order = np.arange(n_old)
+        order[positions[replaced]] = n_old + np.flatnonzero(replaced)
+        order = np.concatenate((order, n_old + np.flatnonzero(~replaced)))
+        # Posisi akhir setiap meal input (urutan sama dengan meals)
+        updated = positions.copy()
+        updated[~replaced] = n_old + np.arange((~replaced).sum())
+
+        # Baris lama dipakai apa adanya (tanpa dequantize / kuantisasi ulang);
+        # tanpa penggantian cukup vstack, permutasi hanya bila ada id lama
+        def splice(old, new):
+            matrix = sparse.vstack((old, new), format='csr')
+            return matrix[order] if replaced.any() else matrix
+
+        feature_matrix = splice(bundle.load_csr(bundle_dir, 'feature_matrix', shape), new_features)
+        stored = splice(bundle.load_csr(bundle_dir, 'normalized', shape),
+                        bundle.quantize(new_normalized, feature_dtype, new_scales))
+        scales = None
+        if new_scales is not None:
+            scales = np.concatenate((bundle.load_row_scales(bundle_dir, manifest), new_scales))[order]
+
+        new_rows = pa.Table.from_pandas(meals[table.column_names], schema=table.schema, preserve_index=False)
+        meal_data = pa.concat_tables((table, new_rows))
+        if replaced.any():
+            meal_data = meal_data.take(order)
+
+        partitions = {'type': self._type_partitions(bundle_dir, manifest, table, meals, positions[replaced],
+                                                    meal_data, stored)}
+
+        ann_index = None
+        if manifest['has_ann']:
+            # Hanya meal baru / berubah yang di-assign ke list IVF
+            ann_index = joblib.load(os.path.join(bundle_dir, 'ann_index.pkl')).update(updated, new_normalized)
+
+        drift = self._drift(manifest.get('drift', {'rows_at_refit': n_old}), engineer, meals)
+        version = bundle.write_bundle(
+            self.model_dir,
+            feature_matrix=feature_matrix,
+            normalized_matrix=stored,
+            meal_data=meal_data,
+            partitions=partitions,
+            vectorizer=os.path.join(bundle_dir, 'vectorizer.pkl'),
+            scaler=os.path.join(bundle_dir, 'scaler.pkl'),
+            ann_index=ann_index,
+            feature_dtype=feature_dtype,
+            quantized=True,
+            row_scale=scales,
+            keep=self.keep_bundles,
+            extra={'drift': drift, 'base_version': manifest.get('base_version', manifest['version']),
+                   'refit_neighbor_k': refit_neighbor_k(manifest)}
+        )
+        return version, drift
+
+    def _type_partitions(self, bundle_dir, manifest, table, meals, replaced, meal_data, stored):
+        """
+        Partisi meal type bundle baru; type yang tidak tersentuh update
+        di-link dari bundle lama, hanya type meal baru / berubah yang dibangun ulang
+        """
+        touched = set(meals['type'].dropna()) | set(table['type'].take(replaced).drop_null().to_pylist())
+        types = meal_data['type']
+        part_dir = os.path.join(bundle_dir, 'partitions', 'type')
+        partitions = {}
+        for k, value in enumerate(manifest['partitions'].get('type', [])):
+            if value not in touched:
+                positions = np.load(os.path.join(part_dir, f'{k}.positions.npy'), mmap_mode='r')
+                partitions[value] = Partition(positions, None, source=(part_dir, str(k)))
+        for value in sorted(touched, key=str):
+            positions = np.flatnonzero(pc.equal(types, value).fill_null(False).to_numpy(zero_copy_only=False))
+            if len(positions):
+                partitions[value] = Partition(positions, stored[positions])
+        return partitions
+
+    def _drift(self, drift, engineer, meals):
+        """Akumulasi token di luar vocabulary & nilai nutrisi di luar rentang scaler"""
+        drift = {key: drift.get(key, 0) for key in
+                 ('rows_at_refit', 'updated_rows', 'tokens', 'oov_tokens', 'values', 'out_of_range')}
+        analyzer = engineer.vectorizer.build_analyzer()
+        vocabulary = engineer.vectorizer.vocabulary_
+        for text in meals['combined_text']:
+            tokens = analyzer(text)
+            drift['tokens'] += len(tokens)
+            drift['oov_tokens'] += sum(token not in vocabulary for token in tokens)
+
+        values = meals[NUMERIC_FEATURES].to_numpy(dtype=float)
+        outside = (values < engineer.scaler.data_min_) | (values > engineer.scaler.data_max_)
+        drift['values'] += int(values.size)
+        drift['out_of_range'] += int(outside.sum())
+        drift['updated_rows'] += len(meals)
+        return drift
+
+
+def refit_neighbor_k(manifest):
+    """neighbor_k yang dipakai refit berikutnya (bundle update sendiri tanpa tabel)"""
+    return manifest.get('refit_neighbor_k', manifest.get('neighbor_k', 0))
+
+
+def drift_score(drift):
+    """Maksimum dari rasio token OOV, rasio nilai di luar rentang scaler dan
+    rasio meal yang di-update sejak refit terakhir"""
+    return max(
+        drift['oov_tokens'] / max(drift['tokens'], 1),
+        drift['out_of_range'] / max(drift['values'], 1),
+        drift['updated_rows'] / max(drift['rows_at_refit'], 1),
+    )
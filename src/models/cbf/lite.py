@@ -0,0 +1,114 @@
+"""Path query ringan yang hanya butuh NumPy.
+
+BundleSearcher membuka array bundle hasil CBFTrainer (memory-map) dan
+menghitung cosine langsung dari komponen CSR, tanpa pandas, scipy,
+scikit-learn maupun joblib. Cocok untuk cron/sidecar yang cukup butuh
+id meal rekomendasi; CBFRecommender tetap dipakai bila butuh metadata
+lengkap, ANN atau cache.
+"""
+import os
+import numpy as np
+from . import bundle
+
+
+def _top_k(scores, k):
+    """Indeks k skor tertinggi (urut turun, seri dipecah dengan indeks terkecil).
+
+    Memakai partial selection O(N) alih-alih argsort penuh O(N log N).
+    """
+    size = len(scores)
+    k = min(k, size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < size:
+        kth = np.partition(scores, size - k)[size - k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:k - len(above)]
+        top = np.concatenate((above, tied))
+    else:
+        top = np.arange(size)
+    return top[np.lexsort((top, -scores[top]))]
+
+
+class CSRArrays:
+    def __init__(self, directory, name, n_rows):
+        """Komponen CSR (data, indices, indptr) yang di-memory-map"""
+        self.data, self.indices, self.indptr = (
+            np.load(os.path.join(directory, f'{name}.{part}.npy'), mmap_mode='r')
+            for part in ('data', 'indices', 'indptr')
+        )
+        self.n_rows = n_rows
+        self._row_ids = None
+
+    def row(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def dot(self, vector):
+        """matrix @ vector untuk vector dense"""
+        if self._row_ids is None:
+            self._row_ids = np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+        return np.bincount(self._row_ids, weights=self.data * vector[self.indices], minlength=self.n_rows)
+
+
+class BundleSearcher:
+    def __init__(self, model_dir='models/'):
+        """
+        Jawab query recommend dari bundle terbaru hanya dengan NumPy
+
+        Args:
+            model_dir: Folder artefak hasil CBFTrainer (harus berisi bundle,
+                artefak lama joblib tidak didukung)
+        """
+        bundle_dir = bundle.latest_bundle(model_dir)
+        if bundle_dir is None:
+            raise FileNotFoundError(f"Tidak ada bundle di {model_dir}, jalankan training terlebih dahulu")
+        manifest = bundle.read_manifest(bundle_dir)
+        self.model_version = manifest['version']
+        self.n_features = manifest['n_features']
+        self.row_scale = bundle.load_row_scales(bundle_dir, manifest)
+        self.meal_ids = np.load(os.path.join(bundle_dir, 'meal_ids.npy'), mmap_mode='r')
+        self.normalized = CSRArrays(bundle_dir, 'normalized', manifest['n_rows'])
+        self._positions = {int(meal_id): i for i, meal_id in enumerate(self.meal_ids)}
+
+        self.partitions = {}
+        part_dir = os.path.join(bundle_dir, 'partitions', 'type')
+        for k, value in enumerate(manifest['partitions'].get('type', [])):
+            positions = np.load(os.path.join(part_dir, f'{k}.positions.npy'), mmap_mode='r')
+            self.partitions[value] = (positions, CSRArrays(part_dir, str(k), len(positions)))
+
+    def _query_vector(self, history):
+        query = np.zeros(self.n_features)
+        for i in history:
+            indices, data = self.normalized.row(i)
+            # Baris int8 dikembalikan ke skala cosine dengan skala per baris
+            query[indices] += data if self.row_scale is None else data * self.row_scale[i]
+        return query / max(len(history), 1)
+
+    def recommend(self, meal_ids, n=5, meal_type=None):
+        """
+        Args:
+            meal_ids: Riwayat meal (id yang tidak dikenal diabaikan)
+            n: Jumlah rekomendasi
+            meal_type: Batasi ke satu meal type (None = seluruh katalog)
+
+        Returns:
+            Tuple: (array id meal, array skor cosine) urut peringkat
+        """
+        history = np.unique(np.array(
+            [self._positions[int(m)] for m in meal_ids if int(m) in self._positions], dtype=np.intp
+        ))
+        query = self._query_vector(history)
+        if meal_type:
+            if meal_type not in self.partitions:
+                return np.empty(0, dtype=self.meal_ids.dtype), np.empty(0)
+            positions, matrix = self.partitions[meal_type]
+        else:
+            positions, matrix = np.arange(self.normalized.n_rows), self.normalized
+        scores = matrix.dot(query)
+        if self.row_scale is not None:
+            scores = scores * self.row_scale[positions]
+
+        candidates = np.flatnonzero(~np.isin(positions, history))
+        top = candidates[_top_k(scores[candidates], n)]
+        return np.asarray(self.meal_ids[positions[top]]), scores[top]
@@ -1,37 +1,83 @@
 import pandas as pd
-import joblib
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
 import json
+from sklearn.preprocessing import normalize
 from .feature_engineering import FeatureEngineer
+from .ann import IVFIndex
+from .bundle import write_bundle
+from .partitions import build_partitions
+
+def load_training_data(data_path):
+    """Baca data CBF: Parquet dengan kolom list native (output convertion),
+    atau CSV lama dengan ingredients & tags berupa list JSON per sel"""
+    if str(data_path).endswith('.parquet'):
+        table = pq.read_table(data_path)
+        for column in ('ingredients', 'tags'):
+            assert pa.types.is_list(table.schema.field(column).type), f"{column} harus kolom list"
+        return table.to_pandas()
+
+    # Baca data dengan format yang benar
+    df = pd.read_csv(
+        data_path,
+        converters={
+            'ingredients': lambda x: json.loads(x.replace("'", '"')),
+            'tags': lambda x: json.loads(x.replace("'", '"'))
+        }
+    )
+    
+    # Pastikan tipe data sudah benar
+    assert isinstance(df['ingredients'].iloc[0], list), "Ingredients harus list"
+    assert isinstance(df['tags'].iloc[0], list), "Tags harus list"
+    return df
 
 class CBFTrainer:
-    def __init__(self, data_path):
+    def __init__(self, data_path=None, model_dir='models/', build_ann=False, ann_lists=None,
+                 feature_dtype='float32', neighbor_k=0, keep_bundles=None):
         self.data_path = data_path
-        self.model_dir = 'models/'
+        self.model_dir = model_dir
+        self.build_ann = build_ann
+        self.ann_lists = ann_lists
+        self.feature_dtype = feature_dtype
+        self.neighbor_k = neighbor_k
+        self.keep_bundles = keep_bundles
         self.feature_engineer = FeatureEngineer()
         os.makedirs(self.model_dir, exist_ok=True)
         
-    def train(self):
-        # Baca data dengan format yang benar
-        df = pd.read_csv(
-            self.data_path,
-            converters={
-                'ingredients': lambda x: json.loads(x.replace("'", '"')),
-                'tags': lambda x: json.loads(x.replace("'", '"'))
-            }
-        )
-        
-        # Pastikan tipe data sudah benar
-        assert isinstance(df['ingredients'].iloc[0], list), "Ingredients harus list"
-        assert isinstance(df['tags'].iloc[0], list), "Tags harus list"
+    def train(self, df=None):
+        """Full fit dari data_path, atau dari DataFrame katalog bila diberikan"""
+        if df is None:
+            df = load_training_data(self.data_path)
         
         # Proses feature engineering
         feature_matrix = self.feature_engineer.prepare_features(df)
         
-        # Simpan model
-        joblib.dump(self.feature_engineer.vectorizer, os.path.join(self.model_dir, 'tfidf_vectorizer.pkl'))
-        joblib.dump(self.feature_engineer.scaler, os.path.join(self.model_dir, 'scaler.pkl'))
-        joblib.dump(feature_matrix, os.path.join(self.model_dir, 'feature_matrix.pkl'))
-        df.to_csv(os.path.join(self.model_dir, 'meal_data.csv'), index=False)
-        
-        print("Model training completed!")
\ No newline at end of file
+        normalized_matrix = normalize(feature_matrix, norm='l2', axis=1).tocsr()
+        partitions = {'type': build_partitions(df['type'], normalized_matrix)}
+
+        # Index ANN opsional untuk katalog besar
+        ann_index = None
+        if self.build_ann:
+            ann_index = IVFIndex(n_lists=self.ann_lists).fit(normalized_matrix)
+
+        # Simpan model sebagai satu bundle yang bisa di-memory-map
+        self.version = write_bundle(
+            self.model_dir,
+            feature_matrix=feature_matrix,
+            normalized_matrix=normalized_matrix,
+            meal_data=df,
+            partitions=partitions,
+            vectorizer=self.feature_engineer.vectorizer,
+            scaler=self.feature_engineer.scaler,
+            ann_index=ann_index,
+            feature_dtype=self.feature_dtype,
+            neighbor_k=self.neighbor_k,
+            keep=self.keep_bundles,
+            extra={'drift': {
+                'rows_at_refit': len(df), 'updated_rows': 0,
+                'tokens': 0, 'oov_tokens': 0, 'values': 0, 'out_of_range': 0
+            }}
+        )
+
+        print(f"Model training completed! (bundle {self.version})")
@@ -0,0 +1,102 @@
+"""Tabel tetangga item-ke-item top-K yang dibangun saat training.
+
+Untuk setiap meal disimpan K meal paling mirip (cosine) di seluruh katalog
+('all') dan per meal type, sebagai array N x K posisi & skor yang di-memory-map.
+Query dengan riwayat pendek cukup menggabungkan beberapa list lalu memberi
+skor exact pada gabungannya; hasil dijamin sama dengan scan penuh bila skor
+ke-n masih di atas batas atas skor meal di luar list (rata-rata skor ke-K
+tiap list), selain itu recommender kembali ke scan penuh.
+"""
+import os
+import numpy as np
+
+# Toleransi pembulatan antara skor tabel (disimpan float32) dan skor query
+SCORE_TOLERANCE = 1e-5
+
+
+def _top_columns(scores, k):
+    """(kolom, skor) k skor tertinggi per baris, urut turun"""
+    width = scores.shape[1]
+    top = np.argpartition(scores, width - k, axis=1)[:, width - k:]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def write_neighbor_tables(directory, matrix, groups, k, memory_budget=256 * 2**20):
+    """
+    Tulis top-k tetangga setiap baris matrix di seluruh katalog ('all') dan
+    di dalam tiap grup ('type/<i>')
+
+    Kolom skor disusun urut grup sehingga tiap grup adalah potongan kontigu
+    dari satu matriks skor per blok baris; blok dibatasi memory_budget byte
+    dan hasil ditulis langsung ke .npy lewat memmap.
+
+    Args:
+        directory: Folder output ('<nama>.positions.npy' & '<nama>.scores.npy')
+        matrix: Matriks ternormalisasi seluruh katalog (CSR)
+        groups: List posisi global baris per grup (saling lepas, mis. partisi type)
+        k: Jumlah tetangga per baris
+    """
+    n_rows = matrix.shape[0]
+    grouped = np.concatenate([np.asarray(g, dtype=np.int64) for g in groups] + [np.empty(0, dtype=np.int64)])
+    column_order = np.concatenate((grouped, np.setdiff1d(np.arange(n_rows), grouped)))
+    bounds = np.concatenate(([0], np.cumsum([len(g) for g in groups])))
+    pools = {'all': (0, n_rows)}
+    pools.update({os.path.join('type', str(i)): (bounds[i], bounds[i + 1]) for i in range(len(groups))})
+
+    outputs = {}
+    for name, (first, last) in pools.items():
+        pool_k = int(min(k, last - first))
+        outputs[name] = (first, last, pool_k, *(
+            np.lib.format.open_memmap(os.path.join(directory, f'{name}.{part}.npy'), mode='w+',
+                                      dtype=dtype, shape=(n_rows, pool_k))
+            for part, dtype in (('positions', np.int32), ('scores', np.float32))
+        ))
+
+    # Fitur numerik membuat hampir semua pasangan bernilai non-nol, jadi blok
+    # source dibuat dense dan dikalikan sparse x dense
+    targets = matrix[column_order]
+    column_of = np.empty(n_rows, dtype=np.int64)
+    column_of[column_order] = np.arange(n_rows)
+    block_rows = max(1, memory_budget // (8 * (n_rows + matrix.shape[1])))
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        scores = np.ascontiguousarray((targets @ matrix[start:stop].toarray().T).T)
+        # Meal tidak menjadi tetangga dirinya sendiri
+        scores[np.arange(stop - start), column_of[start:stop]] = -np.inf
+
+        for first, last, pool_k, positions_out, scores_out in outputs.values():
+            if pool_k == 0:
+                continue
+            top, top_scores = _top_columns(scores[:, first:last], pool_k)
+            missing = np.isneginf(top_scores)
+            positions_out[start:stop] = np.where(missing, -1, column_order[first + top])
+            scores_out[start:stop] = np.where(missing, -np.inf, top_scores)
+
+    for *_, positions_out, scores_out in outputs.values():
+        positions_out.flush()
+        scores_out.flush()
+
+
+class NeighborTable:
+    def __init__(self, directory, name):
+        """Tabel tetangga satu pool (memory-map read-only)"""
+        self.positions = np.load(os.path.join(directory, f'{name}.positions.npy'), mmap_mode='r')
+        self.scores = np.load(os.path.join(directory, f'{name}.scores.npy'), mmap_mode='r')
+
+    def candidates(self, history):
+        """
+        Gabungan tetangga riwayat dan batas atas skor meal di luar gabungan
+
+        Returns:
+            Tuple: (posisi kandidat urut naik, batas atas skor rata-rata)
+        """
+        lists = self.positions[history]
+        # Skor ke-K tiap list adalah batas atas meal di luar list tsb; list yang
+        # memuat seluruh target diakhiri -1 / -inf sehingga batasnya -inf
+        if lists.shape[1]:
+            bound = self.scores[history, -1].astype(np.float64).mean()
+        else:
+            bound = -np.inf
+        return np.unique(lists[lists >= 0]).astype(np.intp), bound
@@ -0,0 +1,74 @@
+import json
+import numpy as np
+import pandas as pd
+
+
+class Partition:
+    """Sekelompok baris katalog dengan nilai kategori yang sama"""
+
+    def __init__(self, positions, matrix, source=None):
+        # positions: posisi baris global (urut naik), matrix: sub-matriks baris tsb
+        # source: (folder, nama) file partisi identik di bundle lain, di-link saat ditulis ulang
+        self.positions = positions
+        self.matrix = matrix
+        self.source = source
+
+    def __len__(self):
+        return len(self.positions)
+
+
+def _categories(value):
+    """Nilai list-like (list, tuple, ndarray dari Arrow, string list JSON
+    dari CSV lama) sebagai list, nilai skalar dikembalikan apa adanya"""
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('[') and text.endswith(']'):
+            value = json.loads(text.replace("'", '"'))
+        else:
+            return value
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        # Item ganda dalam satu baris tidak boleh menggandakan posisi partisi
+        return list(dict.fromkeys(value))
+    return value
+
+
+def build_partitions(values, matrix):
+    """Bagi baris matrix menjadi partisi kontigu per nilai kategori.
+
+    Args:
+        values: Nilai kategori per baris (mis. kolom 'type'). Nilai list-like
+            (mis. tags: list, ndarray dari Arrow, atau string JSON dari CSV
+            lama) di-explode sehingga satu baris bisa masuk ke beberapa partisi.
+        matrix: Matriks fitur (baris sejajar dengan values)
+
+    Returns:
+        Dict: {nilai_kategori: Partition}
+    """
+    series = pd.Series(values).reset_index(drop=True).dropna()
+    try:
+        codes, uniques = pd.factorize(series.to_numpy())
+    except TypeError:
+        # Sel list / ndarray tidak hashable, di-parse per baris
+        series = series.map(_categories).explode().dropna()
+        codes, uniques = pd.factorize(series.to_numpy())
+    else:
+        # Kolom string biasa (mis. 'type') cukup diperiksa per nilai unik;
+        # string list JSON (tags CSV lama) di-parse sekali per nilai unik
+        parsed = [_categories(value) for value in uniques]
+        if any(isinstance(value, list) for value in parsed):
+            lists = pd.Series(parsed, dtype=object).to_numpy()
+            series = pd.Series(lists[codes], index=series.index).explode().dropna()
+            codes, uniques = pd.factorize(series.to_numpy())
+    rows = series.index.to_numpy()
+
+    # Stable sort menjaga urutan katalog di dalam tiap partisi
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques)))))
+
+    partitions = {}
+    for code, value in enumerate(uniques):
+        positions = rows[order[bounds[code]:bounds[code + 1]]]
+        partitions[value] = Partition(positions, matrix[positions])
+    return partitions
@@ -0,0 +1,121 @@
+"""Index rentang nutrisi untuk retrieval kandidat yang difilter batasan.
+
+Per pool (seluruh katalog atau satu meal type) setiap kolom nutrisi disimpan
+terurut beserta posisinya, sehingga batasan seperti calories <= sisa budget
+cukup dijawab dengan searchsorted. Nutrisi dengan rentang tersempit dipakai
+sebagai kandidat awal, batasan lain dicek langsung pada kandidat tersebut.
+"""
+import numpy as np
+from .catalog import NUMERIC_COLUMNS
+
+
+def range_key(ranges):
+    """Bentuk ranges yang hashable (untuk key cache / pengelompokan batch)"""
+    if not ranges:
+        return None
+    return tuple(sorted((column, low, high) for column, (low, high) in ranges.items()))
+
+
+class RangeIndex:
+    def __init__(self, positions, values):
+        """
+        Args:
+            positions: Posisi global baris pool (urut naik)
+            values: Nilai nutrisi baris pool (M x 5, urutan NUMERIC_COLUMNS);
+                NaN dianggap tidak memenuhi batasan apa pun pada kolom tsb
+        """
+        self.positions = np.asarray(positions, dtype=np.intp)
+        self.values = np.asarray(values, dtype=np.float64)
+        # Satu baris per nutrisi (5 x M) agar searchsorted membaca array kontigu;
+        # NaN diurutkan ke akhir, valid = jumlah nilai non-NaN per nutrisi
+        self.order = np.ascontiguousarray(np.argsort(self.values, axis=0, kind='stable').T)
+        self.sorted = np.take_along_axis(self.values.T, self.order, axis=1)
+        self.valid = (~np.isnan(self.values)).sum(axis=0)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _span(self, column, low, high):
+        """(start, stop) potongan kolom terurut yang berada di [low, high]"""
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"Nutrisi tidak dikenal: {column}")
+        k = NUMERIC_COLUMNS.index(column)
+        # NaN ada di akhir dan dianggap lebih besar dari nilai apa pun oleh searchsorted
+        valid = int(self.valid[k])
+        start = 0 if low is None else int(self.sorted[k].searchsorted(low, side='left'))
+        stop = valid if high is None else min(int(self.sorted[k].searchsorted(high, side='right')), valid)
+        return k, start, max(start, stop)
+
+    def _spans(self, ranges):
+        """Potongan terurut per batasan (k, start, stop, minimum, maksimum), tersempit dulu"""
+        return sorted((self._span(column, low, high) + (low, high) for column, (low, high) in ranges.items()),
+                      key=lambda span: span[2] - span[1])
+
+    def select(self, ranges):
+        """
+        Baris pool yang memenuhi semua batasan
+
+        Args:
+            ranges: {nutrisi: (minimum, maksimum)}, None berarti tanpa batas
+
+        Returns:
+            Array indeks lokal pool (urut naik)
+        """
+        return self._select(self._spans(ranges))
+
+    def _select(self, spans):
+        """select dari potongan _spans"""
+        if not spans:
+            return np.arange(len(self.positions))
+
+        k, start, stop, _, _ = spans[0]
+        selected = self.order[k, start:stop]
+        for k, _, _, low, high in spans[1:]:
+            values = self.values[selected, k]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            selected = selected[keep]
+        if len(selected) * 16 < len(self.positions):
+            return np.sort(selected)
+        # Mask + flatnonzero mengembalikan urutan naik dalam waktu linear tanpa sort
+        mask = np.zeros(len(self.positions), dtype=bool)
+        mask[selected] = True
+        return np.flatnonzero(mask)
+
+    def split(self, ranges, limit):
+        """
+        Baris yang lolos atau yang gagal, mana yang lebih murah
+
+        Bila paling banyak limit baris gagal pada tiap batasan, yang gagal
+        diambil dari potongan di luar rentang pada kolom terurut (biaya
+        sebanding jumlah baris gagal, tanpa select); selain itu select.
+
+        Args:
+            ranges: {nutrisi: (minimum, maksimum)}, None berarti tanpa batas
+            limit: Batas jumlah baris gagal per batasan
+
+        Returns:
+            Tuple: (indeks lokal lolos urut naik, None) atau (None, indeks
+            lokal gagal, tidak urut & bisa berulang)
+        """
+        spans = self._spans(ranges)
+        if spans and len(self.positions) - (spans[0][2] - spans[0][1]) > limit:
+            return self._select(spans), None
+        parts = [part for k, start, stop, _, _ in spans
+                 for part in (self.order[k, :start], self.order[k, stop:]) if len(part)]
+        if len(parts) == 1:
+            return None, parts[0]
+        return None, np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+    def limits(self):
+        """(minimum, maksimum) tiap nutrisi di pool, NaN bila pool kosong"""
+        if len(self.positions) == 0:
+            empty = np.full(len(NUMERIC_COLUMNS), np.nan)
+            return empty, empty.copy()
+        first = self.sorted[:, 0]
+        last = self.sorted[np.arange(len(NUMERIC_COLUMNS)), np.maximum(self.valid - 1, 0)]
+        missing = self.valid == 0
+        return np.where(missing, np.nan, first), np.where(missing, np.nan, last)
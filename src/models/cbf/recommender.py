@@ -1,43 +1,593 @@
-import joblib
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
+from scipy import sparse
 import os
+import time
+from . import bundle
+from .cache import ResultCache
+from .catalog import NUMERIC_COLUMNS, Meal, MealCatalog
+from .lite import _top_k
+from .neighbors import NeighborTable, SCORE_TOLERANCE
+from .partitions import Partition, build_partitions
+from .ranges import RangeIndex, range_key
+from src.utils.metrics import METRICS, instrumented
+
+# Biaya menyalin baris CSR yang lolos batasan, dalam satuan dot satu baris pool:
+# ~2.5x per baris (gather + dot) ditambah overhead tetap fancy indexing scipy.
+# Bila tidak sebanding, scan pool kontigu lebih murah.
+GATHER_ROW_COST = 2.5
+GATHER_OVERHEAD_ROWS = 3000
+
+
+def _partition_key(partition):
+    """(kolom, nilai) hashable untuk key cache / pengelompokan batch, None bila tanpa partisi"""
+    if partition is None:
+        return None
+    column, value = partition
+    return column, value
+
 
 class CBFRecommender:
-    def __init__(self):
-        self.model_dir = 'models/'
+    def __init__(self, model_dir='models/', use_ann=False, n_probe=8,
+                 cache_size=1024, cache_ttl=None, refresh_interval=5.0, compact=True,
+                 neighbor_max_history=8):
+        """
+        Args:
+            model_dir: Folder artefak hasil CBFTrainer
+            use_ann: Pakai index IVF (ann_index.pkl) untuk recommend
+            n_probe: Jumlah list IVF yang di-scan, naikkan untuk recall lebih tinggi
+            cache_size: Jumlah hasil recommend yang di-cache (0 = nonaktif)
+            cache_ttl: Umur entry cache dalam detik (None = tanpa batas)
+            refresh_interval: Jeda minimal (detik) pengecekan bundle baru hasil retrain
+            compact: Simpan metadata bundle sebagai MealCatalog (type & tags
+                berkode int, nama di-intern) alih-alih membuat baris pandas
+                dari Arrow di setiap query; dibangun saat baris pertama
+                diakses sehingga load (dan worker hasil fork) tetap murah
+            neighbor_max_history: Riwayat sepanjang ini atau kurang dijawab
+                dari tabel tetangga (bila ada di bundle) sebelum scan penuh
+        """
+        self.model_dir = model_dir
+        self.use_ann = use_ann
+        self.n_probe = n_probe
+        self.refresh_interval = refresh_interval
+        self.compact = compact
+        self.neighbor_max_history = neighbor_max_history
+        self.cache = ResultCache(maxsize=cache_size, ttl=cache_ttl)
+        # Kolom partisi tambahan (add_partition) yang dibangun ulang setiap reload
+        self._extra_partitions = []
         self.load_models()
-        
+
+    @instrumented('load_models')
     def load_models(self):
-        self.vectorizer = joblib.load(os.path.join(self.model_dir, 'tfidf_vectorizer.pkl'))
-        self.scaler = joblib.load(os.path.join(self.model_dir, 'scaler.pkl'))
+        """Buka bundle terbaru (memory-map), atau artefak lama bila belum ada bundle"""
+        self._vectorizer = None
+        self._scaler = None
+        self._meal_data = None
+        self._meal_table = None
+        self._catalog = None
+        self._row_scale = None
+        self.neighbors = {}
+        self.ann_index = None
+        self.partitions = {}
+        self._pools = {}
+        self._range_indexes = {}
+
+        bundle_dir = bundle.latest_bundle(self.model_dir)
+        if bundle_dir is None:
+            self._load_legacy()
+        else:
+            self._load_bundle(bundle_dir)
+
+        self._id_index = pd.Index(self.meal_ids)
+        self._all_positions = np.arange(len(self.meal_ids))
+        self._index_types()
+        for column in self._extra_partitions:
+            if column not in self.partitions:
+                self.add_partition(column)
+
+        # Hasil model lama tidak boleh terbawa setelah reload
+        self.cache.clear()
+        self._last_refresh = time.monotonic()
+
+    def refresh(self, force=False):
+        """Reload bila LATEST menunjuk bundle lain (mis. setelah retrain).
+
+        Dicek paling sering tiap refresh_interval detik kecuali force=True.
+
+        Returns:
+            bool: True bila model di-reload
+        """
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return False
+        self._last_refresh = now
+        if bundle.latest_bundle(self.model_dir) == self.bundle_dir:
+            return False
+        self.load_models()
+        return True
+
+    def cache_stats(self):
+        """Counter hit/miss cache beserta versi model aktif"""
+        return {**self.cache.stats(), 'model_version': self.model_version}
+
+    def _load_bundle(self, bundle_dir):
+        """Semua array di-memory-map read-only, worker hasil fork berbagi page yang sama"""
+        manifest = bundle.read_manifest(bundle_dir)
+        self.bundle_dir = bundle_dir
+        self.model_version = manifest['version']
+        self._artifact_paths = {
+            'vectorizer': os.path.join(bundle_dir, 'vectorizer.pkl'),
+            'scaler': os.path.join(bundle_dir, 'scaler.pkl'),
+        }
+
+        shape = (manifest['n_rows'], manifest['n_features'])
+        self.feature_matrix = bundle.load_csr(bundle_dir, 'feature_matrix', shape)
+        self.normalized_matrix = bundle.load_csr(bundle_dir, 'normalized', shape)
+        self.meal_ids = np.load(os.path.join(bundle_dir, 'meal_ids.npy'), mmap_mode='r')
+        self._meal_table = bundle.load_meal_table(bundle_dir)
+        self._row_scale = bundle.load_row_scales(bundle_dir, manifest)
+
+        for column, values in manifest['partitions'].items():
+            part_dir = os.path.join(bundle_dir, 'partitions', column)
+            self.partitions[column] = {}
+            for k, value in enumerate(values):
+                positions = np.load(os.path.join(part_dir, f'{k}.positions.npy'), mmap_mode='r')
+                matrix = bundle.load_csr(part_dir, str(k), (len(positions), shape[1]))
+                self.partitions[column][value] = Partition(positions, matrix)
+
+        if manifest.get('neighbor_k'):
+            neighbor_dir = os.path.join(bundle_dir, 'neighbors')
+            self.neighbors[None] = NeighborTable(neighbor_dir, 'all')
+            for k, value in enumerate(manifest['partitions'].get('type', [])):
+                self.neighbors[value] = NeighborTable(os.path.join(neighbor_dir, 'type'), str(k))
+
+        if self.use_ann and manifest['has_ann']:
+            import joblib
+            self.ann_index = joblib.load(os.path.join(bundle_dir, 'ann_index.pkl'), mmap_mode='r')
+
+    def _load_legacy(self):
+        """Artefak lama: tiga file joblib + meal_data.csv"""
+        # joblib & scikit-learn hanya dibutuhkan artefak lama, bukan path bundle
+        import joblib
+        from sklearn.preprocessing import normalize
+        self.bundle_dir = None
+        self.model_version = f"legacy-{int(os.path.getmtime(os.path.join(self.model_dir, 'feature_matrix.pkl')))}"
+        self._artifact_paths = {
+            'vectorizer': os.path.join(self.model_dir, 'tfidf_vectorizer.pkl'),
+            'scaler': os.path.join(self.model_dir, 'scaler.pkl'),
+        }
         self.feature_matrix = joblib.load(os.path.join(self.model_dir, 'feature_matrix.pkl'))
-        self.meal_data = pd.read_csv(os.path.join(self.model_dir, 'meal_data.csv'))
-        
-    def recommend(self, meal_ids, n=5, meal_type=None):
-        indices = self.meal_data[self.meal_data['id'].isin(meal_ids)].index
-        input_features = self.feature_matrix[indices]
-        
-        similarities = cosine_similarity(input_features, self.feature_matrix)
-        avg_similarities = similarities.mean(axis=0)
-        
-        # Filter by meal type
-        valid_indices = np.arange(len(self.meal_data))
-        if meal_type:
-            mask = self.meal_data['type'] == meal_type
-            valid_indices = valid_indices[mask]
-            avg_similarities = avg_similarities[mask]
-            
+        # Artefak lama masih berupa ndarray dense, ubah ke CSR agar path query sama
+        if not sparse.issparse(self.feature_matrix):
+            self.feature_matrix = sparse.csr_matrix(self.feature_matrix)
+        self._meal_data = pd.read_csv(os.path.join(self.model_dir, 'meal_data.csv'))
+        if self.use_ann:
+            self.ann_index = joblib.load(os.path.join(self.model_dir, 'ann_index.pkl'))
+
+        # Normalisasi L2 per baris sekali saja, cosine jadi cukup dot product
+        self.normalized_matrix = normalize(self.feature_matrix, norm='l2', axis=1).tocsr()
+        self.meal_ids = self._meal_data['id'].to_numpy()
+        self.add_partition('type')
+
+    def _index_types(self):
+        """Kode meal type per baris, diturunkan dari partisi 'type'"""
+        self._type_codes = np.full(len(self.meal_ids), -1, dtype=np.int32)
+        self._type_lookup = {}
+        for code, (value, partition) in enumerate(self.partitions['type'].items()):
+            self._type_codes[partition.positions] = code
+            self._type_lookup[value] = code
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            import joblib
+            self._vectorizer = joblib.load(self._artifact_paths['vectorizer'])
+        return self._vectorizer
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            import joblib
+            self._scaler = joblib.load(self._artifact_paths['scaler'])
+        return self._scaler
+
+    @property
+    def catalog(self):
+        """MealCatalog bundle (compact=True), None untuk artefak lama atau compact=False"""
+        if self._catalog is None and self.compact and self._meal_table is not None:
+            self._catalog = MealCatalog.from_table(self._meal_table)
+        return self._catalog
+
+    @property
+    def meal_data(self):
+        """DataFrame katalog lengkap (dari bundle baru dibuat saat pertama diakses)"""
+        if self._meal_data is None:
+            self._meal_data = self._meal_table.to_pandas()
+        return self._meal_data
+
+    @instrumented('recommend.rows')
+    def _rows(self, positions):
+        """Baris meal_data untuk posisi tertentu, index = posisi baris"""
+        if self.catalog is not None:
+            return self.catalog.frame(positions)
+        if self._meal_data is not None:
+            return self._meal_data.iloc[positions]
+        rows = self._meal_table.take(positions).to_pandas()
+        rows.index = positions
+        return rows
+
+    def add_partition(self, column, values=None):
+        """Bangun partisi per nilai kategori (mis. 'type', 'tags').
+
+        Partisi dipakai lewat argumen partition=(column, nilai) di recommend
+        dan candidates. values opsional untuk memberi nilai yang sudah
+        di-parse, default diambil dari kolom meal_data (dan dibangun ulang
+        otomatis setelah reload bundle).
+        """
+        if values is None:
+            values = self.meal_data[column]
+            if column != 'type' and column not in self._extra_partitions:
+                self._extra_partitions.append(column)
+        self.partitions[column] = build_partitions(values, self.normalized_matrix)
+        self._pools.clear()
+        self._range_indexes.clear()
+
+    def _history_positions(self, meal_ids):
+        """Posisi baris dari meal_ids riwayat (id yang tidak dikenal diabaikan)"""
+        positions = self._id_index.get_indexer_for(list(meal_ids))
+        return np.unique(positions[positions >= 0])
+
+    def _query_vector(self, history):
+        """Rata-rata baris ternormalisasi dari riwayat (= rata-rata cosine)"""
+        if len(history) == 0:
+            return np.zeros(self.normalized_matrix.shape[1])
+        rows = self.normalized_matrix[history]
+        if self._row_scale is not None:
+            # Baris int8 dikembalikan ke skala cosine dengan skala per baris
+            rows = rows.multiply(self._row_scale[history][:, None].astype(np.float64))
+        return self._match_dtype(np.asarray(rows.mean(axis=0), dtype=np.float64).ravel())
+
+    def _match_dtype(self, query):
+        """Query float32 untuk matriks float32 agar scipy tidak menyalin matriks per perkalian"""
+        if self.normalized_matrix.dtype == np.float32:
+            return query.astype(np.float32)
+        return query
+
+    def range_index(self, meal_type=None, partition=None):
+        """RangeIndex nutrisi pool meal type/partisi (seluruh katalog bila kosong), dibangun saat pertama dipakai"""
+        key = (meal_type or None, _partition_key(partition))
+        index = self._range_indexes.get(key)
+        if index is None:
+            positions, _ = self._pool(meal_type, partition)
+            if self.catalog is not None:
+                values = self.catalog.nutrients[positions]
+            elif self._meal_data is not None:
+                values = self._meal_data[list(NUMERIC_COLUMNS)].to_numpy(dtype=np.float64)[positions]
+            else:
+                values = np.column_stack([
+                    np.asarray(self._meal_table[column], dtype=np.float64)[positions] for column in NUMERIC_COLUMNS
+                ])
+            index = self._range_indexes[key] = RangeIndex(positions, values)
+        return index
+
+    def _constrained_pool(self, meal_type, ranges, partition=None):
+        """
+        (posisi global, sub-matriks, indeks lolos, indeks gagal) pool untuk rentang nutrisi
+
+        Bila sebagian besar pool lolos, dikembalikan pool penuh beserta indeks
+        baris yang gagal untuk diberi skor -inf (tanpa select maupun salinan
+        skor). Bila sedikit yang lolos, sub-matriks berisi baris tersebut saja
+        pada pool besar, atau pool penuh beserta indeks baris yang lolos untuk
+        diambil dari hasil skor pada pool kecil (gather CSR tidak sebanding);
+        -inf tidak dipakai di sini karena np.partition lambat pada banyak
+        nilai kembar.
+        """
+        positions, matrix = self._pool(meal_type, partition)
+        if not ranges:
+            return positions, matrix, None, None
+        index = self.range_index(meal_type, partition)
+        local, failing = index.split(ranges, limit=len(positions) // 2)
+        if failing is not None:
+            return positions, matrix, None, failing if len(failing) else None
+        METRICS.incr('recommend.range_rows', len(local))
+        if len(local) <= (len(positions) - GATHER_OVERHEAD_ROWS) / GATHER_ROW_COST:
+            return positions[local], matrix[local], None, None
+        return positions, matrix, local, None
+
+    def _pool(self, meal_type=None, partition=None):
+        """
+        (posisi global, sub-matriks) kandidat; seluruh katalog bila meal_type
+        dan partition kosong. Irisan partisi dengan meal type di-cache per pasangan.
+        """
+        if partition is None:
+            return self._partition_pool('type', meal_type)
+        key = (meal_type or None, _partition_key(partition))
+        pool = self._pools.get(key)
+        if pool is None:
+            positions, matrix = self._partition_pool(*partition)
+            if meal_type:
+                keep = np.flatnonzero(self._type_codes[positions] == self._type_lookup.get(meal_type, -1))
+                positions, matrix = np.asarray(positions)[keep], matrix[keep]
+            pool = self._pools[key] = (positions, matrix)
+        return pool
+
+    def _partition_pool(self, column, value):
+        """(posisi global, sub-matriks) satu partisi; seluruh katalog bila value kosong"""
+        if not value:
+            return self._all_positions, self.normalized_matrix
+        if column not in self.partitions:
+            raise ValueError(f"Partisi '{column}' belum dibangun, panggil add_partition('{column}')")
+        partition = self.partitions[column].get(value)
+        if partition is None:
+            return self._all_positions[:0], self.normalized_matrix[:0]
+        return partition.positions, partition.matrix
+
+    def _ann_candidates(self, query, meal_type, min_size):
+        """Kandidat & skor dari list IVF terdekat, n_probe digandakan bila kandidat kurang"""
+        n_probe = self.n_probe
+        while True:
+            positions, scores = self.ann_index.search(query, n_probe)
+            if meal_type:
+                keep = self._type_codes[positions] == self._type_lookup.get(meal_type, -1)
+                positions, scores = positions[keep], scores[keep]
+            if len(positions) >= min_size or n_probe >= len(self.ann_index.centroids):
+                return positions, scores
+            n_probe *= 2
+
+    def _ranked(self, scores, positions, history, n):
+        """
+        (posisi global, skor) top-n urut peringkat
+
+        Riwayat dibuang dari top-(n + panjang riwayat), bukan dari seluruh
+        pool; baris berskor -inf (gagal batasan) tidak ikut dikembalikan.
+        """
+        top = _top_k(scores, n + len(history))
+        if len(history):
+            top = top[~np.isin(positions[top], history)]
+        top = top[scores[top] > -np.inf][:n]
+        return positions[top], scores[top]
+
+    def _rank(self, scores, positions, history, n):
+        """Posisi global top-n dari pool (urut posisi katalog)"""
+        return np.sort(self._ranked(scores, positions, history, n)[0])
+
+    def _cache_key(self, meal_ids, n, meal_type, ranges=None, partition=None):
+        """Key cache: riwayat ternormalisasi (set terurut), n, meal_type, rentang nutrisi, partisi & versi model"""
+        history = tuple(sorted({int(meal_id) for meal_id in meal_ids}))
+        n_probe = self.n_probe if self.ann_index is not None else None
+        return (self.model_version, history, n, meal_type or None, n_probe, range_key(ranges),
+                _partition_key(partition))
+
+    @instrumented('recommend')
+    def recommend(self, meal_ids, n=5, meal_type=None, ranges=None, partition=None):
+        """
+        Top-n meal paling mirip dengan riwayat
+
+        Args:
+            meal_ids: Id meal riwayat pengguna
+            n: Jumlah rekomendasi
+            meal_type: Batasi ke satu meal type
+            ranges: {nutrisi: (minimum, maksimum)}, mis. {'calories': (None, 600)};
+                hanya baris dalam rentang yang diberi skor
+            partition: (kolom, nilai) partisi tambahan, mis. ('tags', 'rendah kalori')
+                setelah add_partition('tags'); digabung (irisan) dengan meal_type
+        """
+        self.refresh()
+        key = self._cache_key(meal_ids, n, meal_type, ranges, partition)
+        result = self.cache.get(key)
+        METRICS.incr('recommend.cache_hits' if result is not None else 'recommend.cache_misses')
+        if result is None:
+            result = self._recommend(meal_ids, n, meal_type, ranges, partition)
+            self.cache.put(key, result)
+        return result.copy()
+
+    @instrumented('recommend.score')
+    def _score(self, meal_ids, n, meal_type, ranges=None, partition=None):
+        """(skor, posisi pool, posisi riwayat yang belum disingkirkan dari skor) untuk satu query"""
+        history = self._history_positions(meal_ids)
+        query = self._query_vector(history)
+
+        if ranges or partition is not None:
+            # Pool terfilter sudah lebih kecil dari list tetangga / IVF, langsung exact
+            positions, matrix, keep, failing = self._constrained_pool(meal_type, ranges, partition)
+            scores = matrix @ query
+            if keep is not None:
+                scores, positions = scores[keep], positions[keep]
+            if self._row_scale is not None:
+                scores = scores * self._row_scale[positions]
+            if failing is not None:
+                scores[failing] = -np.inf
+            # Posisi pool urut naik: riwayat ikut diberi -inf lewat searchsorted,
+            # sehingga _ranked tidak perlu isin ke riwayat
+            found = np.searchsorted(positions, history)
+            found = found[found < len(positions)]
+            scores[found[positions[found] == history[:len(found)]]] = -np.inf
+            return scores, positions, history[:0]
+
+        table = self.neighbors.get(meal_type or None)
+        if table is not None and 0 < len(history) <= self.neighbor_max_history:
+            found = self._neighbor_candidates(table, query, history, n)
+            if found is not None:
+                return found[1], found[0], history
+
+        # Hanya baris dengan meal type yang diminta (atau list IVF terdekat) yang diberi skor
+        if self.ann_index is not None:
+            positions, scores = self._ann_candidates(query, meal_type, n + len(history))
+        else:
+            positions, matrix = self._pool(meal_type)
+            scores = matrix @ query
+            if self._row_scale is not None:
+                scores = scores * self._row_scale[positions]
+        return scores, positions, history
+
+    def _neighbor_candidates(self, table, query, history, n):
+        """
+        (posisi, skor exact) gabungan list tetangga riwayat, atau None bila
+        top-n gabungan belum pasti sama dengan scan penuh
+        """
+        positions, bound = table.candidates(history)
+        scores = self.normalized_matrix[positions] @ query
+        if self._row_scale is not None:
+            scores = scores * self._row_scale[positions]
+
+        # Meal di luar gabungan skornya <= bound, top-n aman bila skor ke-n di atasnya
+        kept = scores[~np.isin(positions, history)]
+        if len(kept) >= n > 0:
+            exact = np.partition(kept, len(kept) - n)[len(kept) - n] > bound + SCORE_TOLERANCE
+        else:
+            exact = n <= 0 or bound == -np.inf
+        METRICS.incr('recommend.neighbor_hits' if exact else 'recommend.neighbor_fallbacks')
+        return (positions, scores) if exact else None
+
+    def _recommend(self, meal_ids, n, meal_type, ranges=None, partition=None):
+        scores, positions, history = self._score(meal_ids, n, meal_type, ranges, partition)
+
         # Get top recommendations
-        top_indices = (-avg_similarities).argsort()[:n + len(meal_ids)]
-        recommendations = []
-        
-        for idx in top_indices:
-            meal_id = self.meal_data.iloc[valid_indices[idx]]['id']
-            if meal_id not in meal_ids:
-                recommendations.append(meal_id)
-            if len(recommendations) == n:
-                break
-                
-        return self.meal_data[self.meal_data['id'].isin(recommendations)]
\ No newline at end of file
+        return self._rows(self._rank(scores, positions, history, n))
+
+    def recommend_records(self, meal_ids, n=5, meal_type=None, ranges=None, partition=None):
+        """Seperti recommend tetapi berupa list Meal (__slots__), tanpa DataFrame"""
+        self.refresh()
+        scores, positions, history = self._score(meal_ids, n, meal_type, ranges, partition)
+        selected = self._rank(scores, positions, history, n)
+        if self.catalog is not None:
+            return self.catalog.records(selected)
+        return [Meal(**{field: row[field] for field in Meal.__slots__})
+                for row in self._rows(selected).to_dict('records')]
+
+    @instrumented('candidates')
+    def candidates(self, meal_ids, k=20, meal_type=None, ranges=None, partition=None):
+        """Top-k kandidat urut peringkat beserta kolom 'similarity'.
+
+        Dipakai scheduler untuk mengambil satu pool kandidat per meal type
+        sekaligus alih-alih memanggil recommend berulang kali. ranges &
+        partition sama seperti di recommend.
+        """
+        self.refresh()
+        scores, positions, history = self._score(meal_ids, k, meal_type, ranges, partition)
+        ranked, ranked_scores = self._ranked(scores, positions, history, k)
+        return self._rows(ranked).assign(similarity=ranked_scores)
+
+    @instrumented('diversify')
+    def diversify(self, pools, counts, mmr_lambda=0.7):
+        """
+        Isi banyak slot sekaligus dengan maximal marginal relevance (MMR)
+
+        Similarity antar seluruh kandidat dihitung sekali dari matriks
+        ternormalisasi; setiap pilihan hanya memperbarui vektor max-similarity
+        terhadap meal yang sudah terpilih (di semua pool), sehingga biaya per
+        pilihan sebanding jumlah kandidat, bukan ukuran katalog. Pool diisi
+        bergiliran (mis. satu meal type per giliran = satu hari) dan meal
+        tidak diulang sebelum seluruh kandidat pool-nya terpakai.
+
+        Args:
+            pools: {key: (posisi global, relevansi)} kandidat per pool, mis.
+                hasil candidates per meal type
+            counts: {key: jumlah pilihan}
+            mmr_lambda: Bobot relevansi, 1 = urut relevansi, 0 = keragaman saja
+
+        Returns:
+            Dict: {key: array indeks ke kandidat pool urut pemilihan}
+        """
+        keys = [key for key in pools if len(pools[key][0]) and counts.get(key, 0) > 0]
+        picks = {key: np.full(counts.get(key, 0), -1, dtype=np.intp) for key in pools}
+        if not keys:
+            return picks
+
+        positions = np.concatenate([np.asarray(pools[key][0], dtype=np.intp) for key in keys])
+        relevance = np.concatenate([np.asarray(pools[key][1], dtype=np.float64) for key in keys])
+        bounds = np.concatenate(([0], np.cumsum([len(pools[key][0]) for key in keys])))
+
+        rows = self.normalized_matrix[positions]
+        similarity = (rows @ rows.T).toarray().astype(np.float64)
+        if self._row_scale is not None:
+            scale = self._row_scale[positions].astype(np.float64)
+            similarity *= scale[:, None] * scale[None, :]
+
+        max_similarity = np.zeros(len(positions))
+        used = np.zeros(len(positions), dtype=bool)
+        for step in range(max(counts[key] for key in keys)):
+            for k, key in enumerate(keys):
+                if step >= counts[key]:
+                    continue
+                first, last = bounds[k], bounds[k + 1]
+                if used[first:last].all():
+                    # Seluruh kandidat pool sudah terpakai, mulai putaran baru
+                    used[first:last] = False
+                score = mmr_lambda * relevance[first:last] - (1 - mmr_lambda) * max_similarity[first:last]
+                score[used[first:last]] = -np.inf
+                pick = int(np.argmax(score))
+                picks[key][step] = pick
+                used[first + pick] = True
+                np.maximum(max_similarity, similarity[first + pick], out=max_similarity)
+        return picks
+
+    @instrumented('recommend_batch')
+    def recommend_batch(self, queries, chunk_size=256):
+        """Rekomendasi untuk banyak user sekaligus.
+
+        Args:
+            queries: List dict dengan key seperti argumen recommend
+                (meal_ids, n=5, meal_type=None, ranges=None, partition=None)
+            chunk_size: Jumlah user per perkalian matriks (membatasi memori
+                skor menjadi chunk_size x jumlah meal)
+
+        Returns:
+            List DataFrame, satu per query dengan urutan yang sama
+            (selalu exact, index ANN hanya dipakai recommend)
+        """
+        self.refresh()
+        results = [None] * len(queries)
+        keys = [self._cache_key(q['meal_ids'], q.get('n', 5), q.get('meal_type'), q.get('ranges'),
+                                q.get('partition')) for q in queries]
+        misses = []
+        for i, key in enumerate(keys):
+            results[i] = self.cache.get(key)
+            if results[i] is None:
+                misses.append(i)
+        METRICS.incr('recommend_batch.queries', len(queries))
+        METRICS.incr('recommend.cache_misses', len(misses))
+        METRICS.incr('recommend.cache_hits', len(queries) - len(misses))
+
+        for start in range(0, len(misses), chunk_size):
+            chunk = misses[start:start + chunk_size]
+            histories = {i: self._history_positions(queries[i]['meal_ids']) for i in chunk}
+
+            # Kelompokkan per meal type, partisi & rentang nutrisi, satu perkalian matriks per pool
+            groups = {}
+            for i in chunk:
+                group = (queries[i].get('meal_type') or None, _partition_key(queries[i].get('partition')),
+                         range_key(queries[i].get('ranges')))
+                groups.setdefault(group, []).append(i)
+
+            for (meal_type, partition, _), members in groups.items():
+                positions, matrix, keep, failing = self._constrained_pool(
+                    meal_type, queries[members[0]].get('ranges'), partition)
+
+                # Matriks rata-rata riwayat (user x meal)
+                rows, cols, weights = [], [], []
+                for u, i in enumerate(members):
+                    history = histories[i]
+                    rows.extend([u] * len(history))
+                    cols.extend(history)
+                    weights.extend([1.0 / max(len(history), 1)] * len(history))
+                if self._row_scale is not None:
+                    weights = np.asarray(weights) * self._row_scale[cols]
+                averaging = sparse.csr_matrix(
+                    (weights, (rows, cols)),
+                    shape=(len(members), self.normalized_matrix.shape[0])
+                )
+                query_matrix = self._match_dtype((averaging @ self.normalized_matrix).toarray())
+                scores = np.asarray(matrix @ query_matrix.T).T
+                if keep is not None:
+                    scores, positions = scores[:, keep], positions[keep]
+                if self._row_scale is not None:
+                    scores = scores * self._row_scale[positions]
+                if failing is not None:
+                    scores[:, failing] = -np.inf
+
+                for u, i in enumerate(members):
+                    selected = self._rank(scores[u], positions, histories[i], queries[i].get('n', 5))
+                    results[i] = self._rows(selected)
+                    self.cache.put(keys[i], results[i])
+        return [result.copy() for result in results]
@@ -0,0 +1,126 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+# Recommender per proses worker, diisi oleh _init_worker
+_worker_scheduler = None
+
+
+def _init_worker(model_dir: str, pool_size: int, time_budget: float, mmr_lambda: Optional[float]):
+    """
+    Buka recommender sekali per worker. Dengan bundle hasil CBFTrainer semua
+    array di-memory-map read-only sehingga seluruh worker berbagi page yang
+    sama di page cache, bukan unpickle salinan sendiri-sendiri.
+    """
+    global _worker_scheduler
+    from src.models.cbf.recommender import CBFRecommender
+    from src.utils.scheduler import MealScheduler
+    _worker_scheduler = MealScheduler(
+        CBFRecommender(model_dir),
+        pool_size=pool_size,
+        time_budget=time_budget,
+        mmr_lambda=mmr_lambda
+    )
+
+
+def _schedule_user(user: Dict, days: int, seed: Optional[int]) -> Dict:
+    """Jalankan di worker: jadwal satu user dalam bentuk siap JSON"""
+    try:
+        _worker_scheduler.rng = np.random.default_rng(seed)
+        schedule = _worker_scheduler.generate_schedule(user, days=user.get('days', days))
+        result = {'user_id': user.get('user_id'), 'schedule': to_jsonable(schedule)}
+        if _worker_scheduler.infeasible_days:
+            # Hari yang tetap melanggar batasan nutrisi (diisi kombinasi terdekat)
+            result['infeasible_days'] = [_json_key(day) for day in _worker_scheduler.infeasible_days]
+        return result
+    except Exception as e:
+        return {'user_id': user.get('user_id'), 'error': str(e)}
+
+
+def to_jsonable(value):
+    """Ubah jadwal (Timestamp, numpy array/scalar) menjadi tipe JSON"""
+    if isinstance(value, dict):
+        return {_json_key(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_key(key):
+    if isinstance(key, datetime):
+        return key.date().isoformat()
+    if isinstance(key, date):
+        return key.isoformat()
+    return str(key)
+
+
+def read_users(path: str) -> Iterator[Dict]:
+    """Baca preferensi user dari file JSONL (satu objek per baris)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def generate_bulk_schedules(users_path: str, output_path: str, model_dir: str = 'models/',
+                            days: int = 7, workers: Optional[int] = None, seed: Optional[int] = None,
+                            pool_size: int = 20, time_budget: float = 0.05,
+                            mmr_lambda: Optional[float] = 0.7) -> Dict:
+    """
+    Generate jadwal untuk banyak user secara paralel
+
+    Hasil ditulis ke output_path (JSONL) begitu tiap user selesai, jumlah
+    task yang sedang berjalan dibatasi agar memori tetap datar untuk file
+    user yang besar.
+    
+    Args:
+        users_path: File JSONL berisi {user_id, history, max_calories, ...}
+        output_path: File JSONL hasil {user_id, schedule[, infeasible_days]}
+            atau {user_id, error}
+        model_dir: Folder model (sebaiknya berisi bundle agar bisa di-mmap)
+        days: Jumlah hari default bila user tidak menentukan 'days'
+        workers: Jumlah proses (default os.cpu_count())
+        seed: Seed dasar, user ke-i memakai seed + i
+        mmr_lambda: Bobot relevansi vs keragaman menu (lihat MealScheduler)
+        
+    Returns:
+        Dict: Ringkasan jumlah user sukses dan gagal
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    summary = {'succeeded': 0, 'failed': 0}
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as out, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model_dir, pool_size, time_budget, mmr_lambda)
+    ) as executor:
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending
+            done, pending = wait(pending, return_when=return_when)
+            for future in done:
+                result = future.result()
+                summary['failed' if 'error' in result else 'succeeded'] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+
+        for i, user in enumerate(read_users(users_path)):
+            user_seed = None if seed is None else seed + i
+            pending.add(executor.submit(_schedule_user, user, days, user_seed))
+            if len(pending) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+        if pending:
+            drain(ALL_COMPLETED)
+
+    return summary
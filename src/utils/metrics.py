@@ -0,0 +1,190 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self, window: int = 10000):
+        """
+        Durasi satu operasi: count & sum total, kuantil dari window sampel terakhir
+
+        Args:
+            window: Jumlah sampel terakhir yang disimpan untuk p50/p95/p99
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.samples:
+            return {q: 0.0 for q in QUANTILES}
+        ordered = sorted(self.samples)
+        return {q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in QUANTILES}
+
+
+class Metrics:
+    def __init__(self, window: int = 10000):
+        """
+        Registry timer & counter untuk hot path (recommend, load_models,
+        scheduler, tahap pipeline)
+
+        Nonaktif secara default: setiap titik instrumentasi hanya mengecek
+        self.enabled lalu langsung memanggil fungsi aslinya.
+
+        Args:
+            window: Jumlah sampel per histogram untuk perhitungan kuantil
+        """
+        self.window = window
+        self.enabled = False
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.profile_dir: Optional[str] = None
+        self.profile_names: frozenset = frozenset()
+        self._profiled = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, profile_dir: Optional[str] = None, profile: Iterable[str] = ('recommend',)):
+        """
+        Aktifkan pengumpulan metrik
+
+        Args:
+            profile_dir: Bila diisi, setiap panggilan terluar ke operasi di
+                profile dijalankan di bawah cProfile dan hasilnya ditulis
+                sebagai <profile_dir>/<nama>-<n>.prof
+            profile: Nama operasi yang di-profile per request
+        """
+        self.profile_dir = profile_dir
+        self.profile_names = frozenset(profile) if profile_dir else frozenset()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.profile_dir = None
+        self.profile_names = frozenset()
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self._profiled = 0
+
+    def incr(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.window)
+            histogram.observe(seconds)
+
+    def call(self, name: str, func: Callable, *args, **kwargs):
+        """Jalankan func dengan timer (dan cProfile bila diminta) saat aktif"""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        depth = getattr(self._local, 'depth', 0)
+        profile = depth == 0 and name in self.profile_names
+        profiler = None
+        if profile:
+            import cProfile
+            profiler = cProfile.Profile()
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            if profiler is None:
+                return func(*args, **kwargs)
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            self.observe(name, time.perf_counter() - start)
+            self._local.depth = depth
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+
+    def _dump_profile(self, name: str, profiler):
+        with self._lock:
+            self._profiled += 1
+            n = self._profiled
+        profiler.dump_stats(os.path.join(self.profile_dir, f"{name}-{n}.prof"))
+
+    def snapshot(self) -> Dict:
+        """Counter & ringkasan histogram (detik) dalam bentuk dict siap JSON"""
+        with self._lock:
+            timers = {}
+            for name, histogram in self.histograms.items():
+                quantiles = histogram.quantiles()
+                timers[name] = {
+                    'count': histogram.count,
+                    'sum': histogram.total,
+                    'mean': histogram.total / histogram.count if histogram.count else 0.0,
+                    'max': histogram.max,
+                    'p50': quantiles[0.5],
+                    'p95': quantiles[0.95],
+                    'p99': quantiles[0.99],
+                }
+            return {'counters': dict(self.counters), 'timers': timers}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = 'meal_scheduler') -> str:
+        """Format teks Prometheus (timer sebagai summary, counter sebagai counter)"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, timer in sorted(snapshot['timers'].items()):
+            metric = f"{prefix}_{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {timer[f"p{int(q * 100)}"]:.9f}')
+            lines += [f"{metric}_sum {timer['sum']:.9f}", f"{metric}_count {timer['count']}"]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Tulis snapshot ke file: .prom/.txt sebagai teks Prometheus, selain itu JSON"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def _metric_name(name: str) -> str:
+    return ''.join(c if c.isalnum() else '_' for c in name)
+
+
+# Registry global yang dipakai seluruh titik instrumentasi
+METRICS = Metrics()
+
+
+def instrumented(name: str):
+    """Decorator timer untuk METRICS; saat nonaktif hanya satu cek flag"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            return METRICS.call(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
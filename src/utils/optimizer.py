@@ -0,0 +1,155 @@
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+NUTRIENTS = ['calories', 'protein', 'fat', 'carbs', 'fiber']
+
+
+class MealPlanOptimizer:
+    def __init__(self, bounds: Dict[str, Tuple[Optional[float], Optional[float]]],
+                 time_budget: float = 0.05):
+        """
+        Optimizer kombinasi menu harian (satu kandidat per waktu makan) yang
+        memaksimalkan total similarity di bawah batasan nutrisi harian
+
+        Args:
+            bounds: {nutrisi: (minimum, maksimum)}, None berarti tanpa batas
+            time_budget: Batas waktu pencarian dalam detik, hasil terbaik
+                sejauh ini dikembalikan bila terlampaui
+        """
+        unknown = set(bounds) - set(NUTRIENTS)
+        if unknown:
+            raise ValueError(f"Nutrisi tidak dikenal: {sorted(unknown)}")
+        self.bounds = bounds
+        self.time_budget = time_budget
+        self.timed_out = False
+
+        limits = [bounds.get(n, (None, None)) for n in NUTRIENTS]
+        self._lower = np.array([-np.inf if low is None else low for low, _ in limits], dtype=float)
+        self._upper = np.array([np.inf if high is None else high for _, high in limits], dtype=float)
+        # Skala pelanggaran per nutrisi mengikuti batas yang dipakai
+        reference = np.where(np.isfinite(self._upper), self._upper, self._lower)
+        self._scale = np.where(np.isfinite(reference), np.maximum(np.abs(reference), 1.0), 1.0)
+
+    @classmethod
+    def from_preferences(cls, preferences: Dict, **kwargs) -> Optional['MealPlanOptimizer']:
+        """
+        Baca batasan dari key preferensi min_<nutrisi>/max_<nutrisi>
+        (mis. max_calories, min_protein)
+
+        Returns:
+            MealPlanOptimizer atau None bila tidak ada batasan
+        """
+        bounds = {}
+        for nutrient in NUTRIENTS:
+            low = preferences.get(f'min_{nutrient}')
+            high = preferences.get(f'max_{nutrient}')
+            if low is not None or high is not None:
+                bounds[nutrient] = (low, high)
+        return cls(bounds, **kwargs) if bounds else None
+
+    def feasible(self, totals: np.ndarray) -> np.ndarray:
+        """Mask baris total nutrisi (n x 5) yang memenuhi semua batasan"""
+        return np.all((totals >= self._lower) & (totals <= self._upper), axis=-1)
+
+    def violation(self, totals: np.ndarray) -> np.ndarray:
+        """Besar pelanggaran batasan (relatif terhadap batasnya), 0 bila feasible"""
+        below = np.maximum(self._lower - totals, 0.0)
+        above = np.maximum(totals - self._upper, 0.0)
+        return ((below + above) / self._scale).sum(axis=-1)
+
+    def solve(self, similarities: List[np.ndarray], nutrients: List[np.ndarray],
+              time_budget: Optional[float] = None, fallback: bool = True):
+        """
+        Cari kombinasi terbaik, satu kandidat per slot
+
+        Enumerasi vektor per kandidat slot pertama (urut skor turun) terhadap
+        seluruh kombinasi slot lainnya, dengan pruning batas atas skor dan
+        berhenti saat time_budget habis. Kombinasi slot lainnya diurutkan
+        menurut nutrisi berbatas pertama sehingga per kandidat hanya potongan
+        yang masih bisa lolos batas nutrisi tsb yang dicek.
+
+        Args:
+            similarities: Per slot, array similarity kandidat (K_i,)
+            nutrients: Per slot, array nutrisi kandidat (K_i x 5) urut NUTRIENTS
+            time_budget: Batas waktu panggilan ini (mis. sisa budget
+                pemanggil), default self.time_budget
+            fallback: Cari kombinasi dengan pelanggaran terkecil bila tidak
+                ada yang feasible (False = kembalikan None)
+
+        Returns:
+            Tuple: (kombinasi indeks terbaik (slot,), total similarity,
+            feasible) -- bila tidak ada yang feasible dikembalikan kombinasi
+            dengan pelanggaran terkecil dan feasible=False
+        """
+        start = time.perf_counter()
+        self.timed_out = False
+        if time_budget is None:
+            time_budget = self.time_budget
+
+        # Semua kombinasi slot 1..M-1 sekaligus
+        rest_shape = [len(s) for s in similarities[1:]]
+        if rest_shape:
+            rest_grid = np.indices(rest_shape).reshape(len(rest_shape), -1).T
+        else:
+            rest_grid = np.empty((1, 0), dtype=np.intp)
+        rest_sim = np.zeros(len(rest_grid))
+        rest_nutr = np.zeros((len(rest_grid), len(NUTRIENTS)))
+        for j in range(rest_grid.shape[1]):
+            rest_sim += similarities[j + 1][rest_grid[:, j]]
+            rest_nutr += nutrients[j + 1][rest_grid[:, j]]
+        rest_best = rest_sim.max() if len(rest_sim) else 0.0
+
+        bounded = np.flatnonzero(np.isfinite(self._lower) | np.isfinite(self._upper))
+        key = int(bounded[0]) if len(bounded) else None
+        if key is not None:
+            order = np.argsort(rest_nutr[:, key], kind='stable')
+            rest_grid, rest_sim, rest_nutr = rest_grid[order], rest_sim[order], rest_nutr[order]
+            key_values = rest_nutr[:, key]
+
+        first_order = np.argsort(-similarities[0], kind='stable')
+        best, best_score = None, -np.inf
+
+        for i in first_order:
+            # Pruning: slot pertama urut turun, jadi batas atas ikut turun
+            upper_bound = similarities[0][i] + rest_best
+            if best is not None and upper_bound <= best_score:
+                break
+
+            low, high = 0, len(rest_grid)
+            if key is not None:
+                base = nutrients[0][i][key]
+                low = int(np.searchsorted(key_values, self._lower[key] - base, side='left'))
+                high = int(np.searchsorted(key_values, self._upper[key] - base, side='right'))
+            if low < high:
+                mask = self.feasible(nutrients[0][i] + rest_nutr[low:high])
+                if mask.any():
+                    feasible_rows = low + np.flatnonzero(mask)
+                    j = feasible_rows[int(rest_sim[feasible_rows].argmax())]
+                    score = similarities[0][i] + rest_sim[j]
+                    if score > best_score:
+                        best, best_score = np.concatenate(([i], rest_grid[j])), score
+
+            # Minimal satu kandidat slot pertama selalu dievaluasi
+            if time.perf_counter() - start > time_budget:
+                self.timed_out = True
+                break
+
+        if best is not None:
+            return best, float(best_score), True
+        if not fallback:
+            return None, -np.inf, False
+
+        # Tidak ada yang feasible: kombinasi dengan pelanggaran terkecil
+        combo, combo_violation = None, np.inf
+        for i in first_order:
+            violations = self.violation(nutrients[0][i] + rest_nutr)
+            j = int(violations.argmin())
+            if violations[j] < combo_violation:
+                combo_violation = violations[j]
+                combo = np.concatenate(([i], rest_grid[j]))
+            if time.perf_counter() - start > time_budget:
+                self.timed_out = True
+                break
+        score = sum(similarities[slot][combo[slot]] for slot in range(len(combo)))
+        return combo, float(score), False
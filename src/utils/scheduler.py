@@ -1,148 +1,305 @@
+import time
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import random
-from typing import Dict, List, Optional
+from typing import Dict, Optional
+from .metrics import METRICS, instrumented
+from .optimizer import MealPlanOptimizer, NUTRIENTS
 
 class MealScheduler:
-    def __init__(self, recommender):
+    MEAL_TYPES = ['Sarapan', 'Makan Siang', 'Makan Malam']
+    # Batas kandidat per meal type saat pool diperlebar untuk perbaikan batasan
+    MAX_REPAIR_POOL = 128
+
+    def __init__(self, recommender, seed: Optional[int] = None, pick_size: int = 3,
+                 pool_size: int = 20, time_budget: float = 0.05,
+                 mmr_lambda: Optional[float] = 0.7):
         """
         Inisialisasi scheduler dengan recommender system
         
         Args:
             recommender: Objek recommender system yang sudah di-load
+            seed: Seed generator NumPy agar jadwal bisa direproduksi
+            pick_size: Jumlah kandidat teratas yang diundi per waktu makan
+            pool_size: Jumlah kandidat per meal type yang diambil sekali
+                (ruang pencarian optimizer batasan nutrisi)
+            time_budget: Batas waktu (detik) seluruh perbaikan batasan nutrisi
+                per jadwal (optimizer & perlebaran pool)
+            mmr_lambda: Bobot relevansi vs keragaman untuk re-ranking MMR
+                seluruh jadwal (None = undi dari pick_size kandidat teratas)
         """
         self.recommender = recommender
         self.schedule = {}
+        self.rng = np.random.default_rng(seed)
+        self.pick_size = pick_size
+        self.pool_size = max(pool_size, pick_size)
+        self.time_budget = time_budget
+        self.mmr_lambda = mmr_lambda
+        # Tanggal jadwal terakhir yang tetap melanggar batasan nutrisi
+        self.infeasible_days = []
 
+    @instrumented('schedule.generate')
     def generate_schedule(self, user_preferences: Dict, days: int = 7) -> Dict:
         """
         Generate jadwal makan untuk X hari kedepan
+
+        Riwayat pengguna hanya diberi skor sekali per meal type, lalu menu
+        seluruh hari dipilih dari pool kandidat tersebut (MMR tanpa
+        pengulangan, atau diundi bila mmr_lambda None) sehingga biaya jadwal
+        30 hari hampir sama dengan 1 hari.
         
         Args:
-            user_preferences: Preferensi pengguna (riwayat, batasan)
+            user_preferences: Preferensi pengguna (riwayat, batasan
+                min_/max_ untuk calories, protein, fat, carbs, fiber)
             days: Jumlah hari yang akan di-generate
             
         Returns:
-            Dict: Jadwal makan dalam format {tanggal: jadwal_harian}
+            Dict: Jadwal makan dalam format {tanggal: jadwal_harian}; tanggal
+            yang tetap melanggar batasan dicatat di self.infeasible_days
         """
+        optimizer = MealPlanOptimizer.from_preferences(user_preferences, time_budget=self.time_budget)
+        slot_ranges = self._slot_ranges(optimizer.bounds) if optimizer is not None else {}
+
+        # Dengan MMR pool minimal sepanjang jadwal agar tidak ada menu berulang
+        pool_size = self.pool_size if self.mmr_lambda is None else max(self.pool_size, days)
+        pools = {
+            meal_type: self._candidate_pool(meal_type, user_preferences, pool_size, slot_ranges.get(meal_type))
+            for meal_type in self.MEAL_TYPES
+        }
+
+        if self.mmr_lambda is not None:
+            picks = self.recommender.diversify(
+                {meal_type: (positions, similarity) for meal_type, (_, _, similarity, positions) in pools.items()},
+                {meal_type: days for meal_type in self.MEAL_TYPES},
+                mmr_lambda=self.mmr_lambda
+            )
+        else:
+            # Undi indeks kandidat untuk semua hari sekaligus (-1 = tidak ada kandidat)
+            picks = {}
+            for meal_type, (records, *_) in pools.items():
+                if records:
+                    picks[meal_type] = self.rng.integers(0, min(self.pick_size, len(records)), size=days)
+                else:
+                    picks[meal_type] = np.full(days, -1)
+
+        infeasible = []
+        if optimizer is not None:
+            infeasible = self._fit_constraints(picks, pools, optimizer, user_preferences, slot_ranges)
+        if self.mmr_lambda is not None:
+            self._report_repeats(picks)
+
         schedule = {}
-        for day in range(days):
-            date = datetime.now().date() + pd.DateOffset(days=day)
-            daily_schedule = self._generate_daily_schedule(user_preferences)
-            schedule[date] = daily_schedule
+        today = datetime.now().date()
+        dates = [today + pd.DateOffset(days=day) for day in range(days)]
+        self.infeasible_days = [dates[day] for day in infeasible]
+        for day, date in enumerate(dates):
+            schedule[date] = {
+                meal_type: dict(pools[meal_type][0][picks[meal_type][day]])
+                if picks[meal_type][day] >= 0 else {}
+                for meal_type in self.MEAL_TYPES
+            }
         return schedule
 
-    def _generate_daily_schedule(self, user_preferences: Dict) -> Dict:
+    def _report_repeats(self, picks: Dict):
+        """Laporkan menu yang terpaksa diulang karena kandidat meal type (yang
+        memenuhi batasan nutrisi) kurang dari jumlah hari"""
+        for meal_type, day_picks in picks.items():
+            chosen = day_picks[day_picks >= 0]
+            repeats = len(chosen) - len(np.unique(chosen))
+            if repeats:
+                METRICS.incr('schedule.repeated_meals', repeats)
+                print(f"Kandidat {meal_type} (yang memenuhi batasan) kurang dari jumlah hari, "
+                      f"{repeats} menu diulang")
+
+    def _slot_ranges(self, bounds: Dict) -> Dict:
         """
-        Generate jadwal untuk 1 hari dengan constraint nutrisi
-        
+        Rentang nutrisi per meal type yang masih mungkin masuk hari feasible
+
+        Batas harian dikurangi kontribusi minimal (atau maksimal, untuk batas
+        bawah) meal type lain di katalog, sehingga meal yang tidak mungkin
+        lolos tidak ikut diberi skor.
+
         Args:
-            user_preferences: Preferensi dan batasan pengguna
-            
+            bounds: {nutrisi: (minimum, maksimum)} batasan harian
+
         Returns:
-            Dict: Jadwal makan harian dengan 3 waktu makan
+            Dict: {meal_type: {nutrisi: (minimum, maksimum)}}
         """
-        meal_types = ['Sarapan', 'Makan Siang', 'Makan Malam']
-        daily_meals = {}
-
-        # Generate meal untuk setiap waktu makan
-        for meal_type in meal_types:
-            try:
-                recommendations = self.recommender.recommend(
-                    meal_ids=user_preferences.get('history', []),
-                    n=3,
-                    meal_type=meal_type
-                )
-                selected_meal = recommendations.sample(1).iloc[0].to_dict()
-                daily_meals[meal_type] = selected_meal
-            except Exception as e:
-                print(f"Error memilih makanan untuk {meal_type}: {str(e)}")
-                daily_meals[meal_type] = {}
-
-        # Validasi total kalori
-        if 'max_calories' in user_preferences:
-            total_calories = sum(
-                meal.get('calories', 0) 
-                for meal in daily_meals.values() 
-                if isinstance(meal, dict)
-            )
-            
-            if total_calories > user_preferences['max_calories']:
-                return self._adjust_schedule(daily_meals, user_preferences)
+        limits = {}
+        for meal_type in self.MEAL_TYPES:
+            index = self.recommender.range_index(meal_type)
+            if len(index):
+                limits[meal_type] = index.limits()
 
-        return daily_meals
+        slot_ranges = {}
+        for meal_type in limits:
+            others = [limits[other] for other in limits if other != meal_type]
+            ranges = {}
+            for nutrient, (low, high) in bounds.items():
+                k = NUTRIENTS.index(nutrient)
+                ranges[nutrient] = (
+                    None if low is None else low - np.nansum([top[k] for _, top in others]),
+                    None if high is None else high - np.nansum([bottom[k] for bottom, _ in others]),
+                )
+            slot_ranges[meal_type] = ranges
+        return slot_ranges
 
-    def _get_meal(self, meal_type: str, preferences: Dict) -> Dict:
+    @instrumented('schedule.candidate_pool')
+    def _candidate_pool(self, meal_type: str, preferences: Dict, pool_size: int,
+                        ranges: Optional[Dict] = None):
         """
-        Dapatkan satu makanan untuk waktu makan tertentu
+        Ambil pool kandidat satu meal type dengan satu kali scoring
         
         Args:
             meal_type: Jenis waktu makan
             preferences: Preferensi pengguna
+            pool_size: Jumlah kandidat yang diambil
+            ranges: Rentang nutrisi per meal dari _slot_ranges; bila tidak
+                ada meal yang lolos dipakai pool tanpa batasan (hari tsb
+                diserahkan ke kombinasi terdekat optimizer)
             
         Returns:
-            Dict: Detail makanan terpilih
+            Tuple: (list dict kandidat urut peringkat, array nutrisi K x 5,
+            array similarity, posisi baris katalog)
         """
-        recommendations = self.recommender.recommend(
-            meal_ids=preferences.get('history', []),
-            n=3,
-            meal_type=meal_type
+        try:
+            candidates = self.recommender.candidates(
+                meal_ids=preferences.get('history', []),
+                k=pool_size,
+                meal_type=meal_type,
+                ranges=ranges
+            )
+            if ranges and candidates.empty:
+                METRICS.incr('schedule.empty_ranges')
+                candidates = self.recommender.candidates(
+                    meal_ids=preferences.get('history', []),
+                    k=pool_size,
+                    meal_type=meal_type
+                )
+        except Exception as e:
+            print(f"Error memilih makanan untuk {meal_type}: {str(e)}")
+            return [], np.empty((0, len(NUTRIENTS))), np.empty(0), np.empty(0, dtype=np.intp)
+        return (
+            candidates.to_dict('records'),
+            candidates[NUTRIENTS].to_numpy(dtype=float),
+            candidates['similarity'].to_numpy(dtype=float),
+            candidates.index.to_numpy(dtype=np.intp)
         )
-        
-        if not recommendations.empty:
-            return recommendations.sample(1).iloc[0].to_dict()
-        return {}
 
-    def _adjust_schedule(self, schedule: Dict, preferences: Dict) -> Dict:
+    @instrumented('schedule.fit_constraints')
+    def _fit_constraints(self, picks: Dict, pools: Dict, optimizer: MealPlanOptimizer,
+                         preferences: Dict, slot_ranges: Dict) -> list:
         """
-        Adjust jadwal untuk memenuhi batasan kalori
-        
+        Ganti kombinasi menu pada hari yang melanggar batasan nutrisi
+
+        Per hari pengganti dicari optimizer berturut-turut dari: kandidat yang
+        belum dipakai di jadwal, kandidat belum dipakai setelah pool diperlebar
+        (candidates dengan rentang nutrisi yang sama, hingga MAX_REPAIR_POOL),
+        lalu seluruh pool (menu boleh diulang). Hari baru dianggap tidak
+        feasible bila tidak ada kombinasi yang lolos di seluruh pool tsb.
+        time_budget berlaku untuk seluruh perbaikan, bukan per hari.
+
         Args:
-            schedule: Jadwal awal
-            preferences: Preferensi pengguna
-            
+            picks: {meal_type: array indeks kandidat per hari}, diubah in-place
+            pools: Pool kandidat dari _candidate_pool, diperlebar in-place
+            optimizer: Optimizer dengan batasan harian pengguna
+            preferences: Preferensi pengguna (riwayat untuk memperlebar pool)
+            slot_ranges: Rentang nutrisi per meal type dari _slot_ranges
+
         Returns:
-            Dict: Jadwal yang sudah disesuaikan
+            List: Indeks hari yang tetap tidak feasible (diisi kombinasi
+            dengan pelanggaran terkecil)
         """
-        max_retries = 3
-        adjusted = schedule.copy()
-        
-        for _ in range(max_retries):
-            # Cari makanan dengan kalori tertinggi
-            max_cal_meal = max(
-                adjusted.items(), 
-                key=lambda x: x[1].get('calories', 0)
+        slots = [meal_type for meal_type in self.MEAL_TYPES if len(pools[meal_type][0])]
+        if not slots:
+            return []
+
+        totals = sum(pools[meal_type][1][picks[meal_type]] for meal_type in slots)
+        violating = np.flatnonzero(~optimizer.feasible(totals))
+        METRICS.incr('schedule.violating_days', len(violating))
+        if len(violating) == 0:
+            return []
+
+        deadline = time.perf_counter() + self.time_budget
+        kept = np.ones(len(totals), dtype=bool)
+        kept[violating] = False
+        used = {}
+        for meal_type in slots:
+            used[meal_type] = np.zeros(len(pools[meal_type][0]), dtype=bool)
+            used[meal_type][picks[meal_type][kept]] = True
+        widened = False
+
+        def solve(candidates, reuse_penalty=0.0, fallback=True):
+            METRICS.incr('schedule.optimizer_runs')
+            combo, _, feasible = optimizer.solve(
+                [pools[meal_type][2][rows] - reuse_penalty * used[meal_type][rows]
+                 for meal_type, rows in zip(slots, candidates)],
+                [pools[meal_type][1][rows] for meal_type, rows in zip(slots, candidates)],
+                time_budget=max(deadline - time.perf_counter(), 0.0),
+                fallback=fallback
             )
-            
-            # Cari pengganti yang lebih rendah kalori
-            meal_type = max_cal_meal[0]
-            current_id = max_cal_meal[1]['id']
-            
-            try:
-                new_recommendations = self.recommender.recommend(
-                    meal_ids=[current_id],
-                    n=3,
-                    meal_type=meal_type
-                )
-                
-                if not new_recommendations.empty:
-                    new_meal = new_recommendations.iloc[0].to_dict()
-                    adjusted[meal_type] = new_meal
-                    
-                    # Hitung ulang total kalori
-                    new_total = sum(
-                        meal.get('calories', 0) 
-                        for meal in adjusted.values()
-                    )
-                    
-                    if new_total <= preferences['max_calories']:
-                        return adjusted
-                        
-            except Exception as e:
-                print(f"Gagal menyesuaikan jadwal: {str(e)}")
+            if combo is None:
+                return None, False
+            return [rows[i] for rows, i in zip(candidates, combo)], feasible
+
+        infeasible, nearest = [], None
+        for day in violating:
+            if nearest is not None:
+                # Seluruh pool sudah terbukti tanpa kombinasi feasible (atau budget
+                # habis); kombinasi terdekat tidak bergantung pada hari
+                for meal_type, pick in zip(slots, nearest):
+                    picks[meal_type][day] = pick
+                infeasible.append(int(day))
                 continue
-                
-        return adjusted
+            while True:
+                free = [np.flatnonzero(~used[meal_type]) for meal_type in slots]
+                combo, feasible = solve(free, fallback=False) if all(len(rows) for rows in free) else (None, False)
+                if feasible or widened or time.perf_counter() > deadline:
+                    break
+                # Kandidat belum dipakai tidak cukup, ambil kandidat peringkat berikutnya
+                for meal_type in slots:
+                    self._widen_pool(meal_type, pools, used, preferences, slot_ranges.get(meal_type))
+                widened = True
+                METRICS.incr('schedule.widened_pools')
+
+            if not feasible:
+                # Menu terpaksa diulang daripada melanggar batasan; penalti per
+                # menu ulang melebihi total similarity sehingga pengulangan seminimal mungkin
+                combo, feasible = solve([np.arange(len(used[meal_type])) for meal_type in slots],
+                                        reuse_penalty=2.0 * len(slots))
+            for meal_type, pick in zip(slots, combo):
+                picks[meal_type][day] = pick
+                used[meal_type][pick] = True
+            if not feasible:
+                nearest = combo
+                infeasible.append(int(day))
+
+        if time.perf_counter() > deadline:
+            METRICS.incr('schedule.repair_timeouts')
+        if infeasible:
+            METRICS.incr('schedule.infeasible', len(infeasible))
+            print(f"{len(infeasible)} hari tidak memenuhi batasan nutrisi, dipakai kombinasi terdekat "
+                  f"(lihat infeasible_days)")
+        return infeasible
+
+    def _widen_pool(self, meal_type: str, pools: Dict, used: Dict, preferences: Dict,
+                    ranges: Optional[Dict]):
+        """
+        Tambahkan kandidat peringkat berikutnya hingga MAX_REPAIR_POOL ke
+        belakang pool (indeks kandidat lama tetap berlaku)
+        """
+        records, nutrients, similarity, positions = pools[meal_type]
+        if len(records) >= self.MAX_REPAIR_POOL:
+            return
+        wider = self._candidate_pool(meal_type, preferences, self.MAX_REPAIR_POOL, ranges)
+        extra = np.flatnonzero(~np.isin(wider[3], positions))
+        pools[meal_type] = (
+            records + [wider[0][i] for i in extra],
+            np.vstack((nutrients, wider[1][extra])),
+            np.concatenate((similarity, wider[2][extra])),
+            np.concatenate((positions, wider[3][extra]))
+        )
+        used[meal_type] = np.concatenate((used[meal_type], np.zeros(len(extra), dtype=bool)))
 
     def print_schedule(self, schedule: Dict):
         """
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from .bulk import to_jsonable
+from .metrics import METRICS
+from .optimizer import NUTRIENTS
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    def __init__(self, recommender, batch_window: float = 0.005, max_batch_size: int = 256):
+        """
+        Kumpulkan request recommend yang datang bersamaan lalu jalankan
+        sebagai satu recommend_batch (satu perkalian matriks per meal type)
+
+        Args:
+            recommender: CBFRecommender yang sudah di-load (tetap hangat)
+            batch_window: Lama (detik) menunggu request lain setelah request
+                pertama masuk, membatasi tambahan latency per request
+            max_batch_size: Batch langsung dijalankan bila sudah sebesar ini
+        """
+        self.recommender = recommender
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, query: Dict):
+        """Masukkan satu query, selesai saat batch-nya selesai diproses"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, future))
+        return await future
+
+    def _recommend_batch(self, queries: List[Dict]) -> List:
+        """
+        recommend_batch; bila gagal diulang per query sehingga query yang
+        error hanya menggagalkan request-nya sendiri
+
+        Returns:
+            List hasil per query (DataFrame atau Exception)
+        """
+        try:
+            return self.recommender.recommend_batch(queries)
+        except Exception:
+            results = []
+            for query in queries:
+                try:
+                    results.append(self.recommender.recommend_batch([query])[0])
+                except Exception as e:
+                    results.append(e)
+            return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Dict, asyncio.Future]] = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            queries = [query for query, _ in batch]
+            try:
+                # Scoring di thread terpisah agar event loop tetap menerima request
+                results = await loop.run_in_executor(None, self._recommend_batch, queries)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(to_jsonable(result.to_dict('records')))
+
+    def stats(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'avg_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'queue_size': self.queue.qsize(),
+        }
+
+
+class RecommendationServer:
+    def __init__(self, recommender, batch_window: float = 0.005, max_batch_size: int = 256):
+        """
+        Server HTTP/1.1 minimal berbasis asyncio dengan satu recommender hangat
+
+        Endpoint:
+            POST /recommend  body {"meal_ids": [...], "n": 5, "meal_type": null,
+                             "ranges": {"calories": [null, 600]}}
+            GET  /stats      statistik batch & cache
+            GET  /metrics    timer & counter (teks Prometheus, /metrics.json untuk JSON)
+            GET  /health
+        """
+        self.recommender = recommender
+        self.batcher = MicroBatcher(recommender, batch_window, max_batch_size)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000, unix_socket: Optional[str] = None):
+        self.batcher.start()
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            logger.info(f"Server berjalan di unix:{unix_socket}")
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+            logger.info(f"Server berjalan di http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self._dispatch(method, path, body)
+                if isinstance(payload, str):
+                    content_type, data = 'text/plain; version=0.0.4', payload.encode('utf-8')
+                else:
+                    content_type, data = 'application/json', json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok', 'model_version': self.recommender.model_version}
+        if method == 'GET' and path == '/stats':
+            return '200 OK', {'batching': self.batcher.stats(), 'cache': self.recommender.cache_stats()}
+        if method == 'GET' and path == '/metrics':
+            return '200 OK', METRICS.to_prometheus()
+        if method == 'GET' and path == '/metrics.json':
+            return '200 OK', METRICS.snapshot()
+        if method == 'POST' and path == '/recommend':
+            try:
+                request = json.loads(body or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("Body harus berupa object JSON")
+                n = request.get('n', 5)
+                if isinstance(n, bool) or not isinstance(n, int) or n <= 0:
+                    raise ValueError("n harus bilangan bulat positif")
+                meal_type = request.get('meal_type')
+                if meal_type is not None and not isinstance(meal_type, str):
+                    raise ValueError("meal_type harus string atau null")
+                query = {
+                    'meal_ids': [int(meal_id) for meal_id in request.get('meal_ids', [])],
+                    'n': n,
+                    'meal_type': meal_type,
+                    'ranges': _parse_ranges(request.get('ranges')),
+                }
+            except (ValueError, TypeError) as e:
+                return '400 Bad Request', {'error': str(e)}
+            start = time.perf_counter()
+            try:
+                meals = await self.batcher.submit(query)
+            except Exception as e:
+                logger.error(f"Gagal memproses rekomendasi: {str(e)}")
+                return '500 Internal Server Error', {'error': str(e)}
+            return '200 OK', {'meals': meals, 'latency_ms': (time.perf_counter() - start) * 1000}
+        return '404 Not Found', {'error': f'{method} {path} tidak dikenal'}
+
+
+def _parse_ranges(ranges) -> Dict:
+    """Validasi ranges request: {nutrisi: [minimum, maksimum]}, batas berupa angka atau null"""
+    if ranges is None:
+        return {}
+    if not isinstance(ranges, dict):
+        raise ValueError("ranges harus berupa object {nutrisi: [minimum, maksimum]}")
+    unknown = set(ranges) - set(NUTRIENTS)
+    if unknown:
+        raise ValueError(f"Nutrisi tidak dikenal: {sorted(unknown)}")
+    parsed = {}
+    for column, bounds in ranges.items():
+        if not isinstance(bounds, list) or len(bounds) != 2 or not all(
+                bound is None or (isinstance(bound, (int, float)) and not isinstance(bound, bool)
+                                  and math.isfinite(bound))
+                for bound in bounds):
+            raise ValueError(f"ranges.{column} harus [minimum, maksimum] berupa angka atau null")
+        low, high = (None if bound is None else float(bound) for bound in bounds)
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"ranges.{column}: minimum lebih besar dari maksimum")
+        parsed[column] = (low, high)
+    return parsed
+
+
+def run_server(recommender, host: str = '127.0.0.1', port: int = 8000, unix_socket: Optional[str] = None,
+               batch_window: float = 0.005, max_batch_size: int = 256):
+    """Jalankan server sampai dihentikan (Ctrl+C)"""
+    server = RecommendationServer(recommender, batch_window, max_batch_size)
+    try:
+        asyncio.run(server.serve(host, port, unix_socket))
+    except KeyboardInterrupt:
+        logger.info("Server dihentikan")